@@ -1,12 +1,23 @@
-import pygame
 import sys
 import random
 
+from life import render, rle
+from life.worker import SimulationWorker
+
+try:
+    from life import snapshot, vectorized
+except ImportError:  # NumPy not installed, fall back to update()
+    snapshot = vectorized = None
+
 # Configuration
 CELL_SIZE = 10       # Size of each cell in pixels
 GRID_WIDTH = 80      # Number of cells horizontally
 GRID_HEIGHT = 60     # Number of cells vertically
-FPS = 10             # Frames per second (simulation speed)
+FPS = 10             # Generations per second (T toggles unthrottled turbo)
+DISPLAY_FPS = 60     # Frames drawn per second
+PATTERN_FILE = "board.rle"    # S saves / L loads the board as RLE
+SNAPSHOT_FILE = "board.snap"  # F5 saves / F9 loads a binary snapshot (needs NumPy)
+STATUS_SECONDS = 4   # How long save/load messages stay on screen
 
 # Colors
 COLOR_BG = (10, 10, 10)
@@ -15,6 +26,11 @@ COLOR_DIE_NEXT = (170, 170, 170)
 COLOR_ALIVE_NEXT = (255, 255, 255)
 COLOR_TEXT = (255, 0, 0)
 
+# Palette renderer for draw_grid(), when NumPy is available
+_renderer = None
+if render.np is not None:
+    _renderer = render.GridRenderer(CELL_SIZE, {1: COLOR_ALIVE_NEXT}, COLOR_BG, COLOR_GRID)
+
 
 def init_grid(randomize=True):
     """Initialize the game grid."""
@@ -28,6 +44,10 @@ def init_grid(randomize=True):
 
 def draw_grid(surface, grid):
     """Draws the grid lines and live cells."""
+    if _renderer is not None:
+        _renderer.draw(surface, grid)
+        return
+    import pygame
     surface.fill(COLOR_BG)
     for y in range(GRID_HEIGHT):
         for x in range(GRID_WIDTH):
@@ -71,17 +91,60 @@ def update(grid):
     return new_grid
 
 
+def next_generation(grid, out=None):
+    """Advance one generation, using the NumPy engine when available.
+
+    The NumPy engine writes into ``out`` if given.
+    """
+    if vectorized is not None:
+        return vectorized.step_classic(grid, out)
+    return update(grid)
+
+
+def save_board(grid, path):
+    """Save the grid as RLE (.rle files) or as a binary snapshot.
+
+    Raises OSError if the file can't be written, ValueError for a snapshot
+    without NumPy.
+    """
+    if path.endswith(".rle"):
+        rle.save(path, grid)
+    elif snapshot is not None:
+        snapshot.save(path, grid)
+    else:
+        raise ValueError("snapshots need NumPy")
+
+
+def load_board(path):
+    """Load an RLE file or snapshot, centered on an empty grid.
+
+    A snapshot is loaded straight into a NumPy board.  Raises OSError or
+    ValueError if the file can't be read, or for a snapshot without NumPy.
+    """
+    if path.endswith(".rle"):
+        pattern, _ = rle.load(path)
+        grid = rle.place(pattern, GRID_WIDTH, GRID_HEIGHT)
+        return [[1 if cell else 0 for cell in row] for row in grid]
+    if snapshot is None:
+        raise ValueError("snapshots need NumPy")
+    board, _ = snapshot.load_centered(path, GRID_WIDTH, GRID_HEIGHT)
+    return (board != 0).astype(board.dtype)
+
+
 def main():
     """Main loop to run the Game of Life with pause and cell toggle."""
+    import pygame
     pygame.init()
     screen = pygame.display.set_mode((GRID_WIDTH * CELL_SIZE, GRID_HEIGHT * CELL_SIZE))
     pygame.display.set_caption("GPT's Game of Life")
     clock = pygame.time.Clock()
     font = pygame.font.SysFont(None, 36)
 
-    grid = init_grid(randomize=True)
-    paused = False
+    # Steps on its own thread; clicks and R/C are applied between generations
+    worker = SimulationWorker(init_grid(randomize=True), next_generation, FPS, reuse=True)
+    worker.start()
     running = True
+    status, status_until = None, 0  # result of the last save or load
 
     while running:
         for event in pygame.event.get():
@@ -89,28 +152,49 @@ def main():
                 running = False
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_r:
-                    grid = init_grid(randomize=True)
+                    worker.replace(init_grid(randomize=True))
                 elif event.key == pygame.K_c:
-                    grid = init_grid(randomize=False)
+                    worker.replace(init_grid(randomize=False))
+                elif event.key in (pygame.K_s, pygame.K_F5):
+                    path = PATTERN_FILE if event.key == pygame.K_s else SNAPSHOT_FILE
+                    try:
+                        save_board(worker.latest()[1], path)
+                        status = f"Saved {path}"
+                    except (OSError, ValueError) as e:
+                        status = f"Could not save {path}: {e}"
+                    status_until = pygame.time.get_ticks() + STATUS_SECONDS * 1000
+                elif event.key in (pygame.K_l, pygame.K_F9):
+                    path = PATTERN_FILE if event.key == pygame.K_l else SNAPSHOT_FILE
+                    try:
+                        worker.replace(load_board(path))
+                        status = f"Loaded {path}"
+                    except (OSError, ValueError) as e:
+                        status = f"Could not load {path}: {e}"
+                    status_until = pygame.time.get_ticks() + STATUS_SECONDS * 1000
                 elif event.key == pygame.K_SPACE:
-                    paused = not paused
+                    worker.paused = not worker.paused
+                elif event.key == pygame.K_t:
+                    worker.turbo = not worker.turbo
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 mx, my = pygame.mouse.get_pos()
                 gx = mx // CELL_SIZE
                 gy = my // CELL_SIZE
                 if 0 <= gx < GRID_WIDTH and 0 <= gy < GRID_HEIGHT:
-                    grid[gy][gx] = 1 - grid[gy][gx]
+                    worker.toggle(gx, gy, 1)
 
-        draw_grid(screen, grid)
-        if paused:
+        _, grid = worker.latest()
+        rects = render.draw_changes(_renderer, screen, grid, draw_grid)
+        overlays = []
+        if worker.paused:
             text = font.render("Paused (Space to toggle)", True, COLOR_TEXT)
-            screen.blit(text, (10, 10))
-        pygame.display.flip()
-
-        if not paused:
-            grid = update(grid)
-        clock.tick(FPS)
-
+            overlays.append(screen.blit(text, (10, 10)))
+        if status is not None and pygame.time.get_ticks() < status_until:
+            text = font.render(status, True, COLOR_TEXT)
+            overlays.append(screen.blit(text, (10, 46)))
+        render.present(_renderer, rects, *overlays)
+        clock.tick(DISPLAY_FPS)
+
+    worker.stop()
     pygame.quit()
     sys.exit()
 
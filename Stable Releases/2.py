@@ -1,12 +1,15 @@
-import pygame
 import sys
 import random
 
+from life import flatgrid, render
+from life.worker import SimulationWorker
+
 # Configuration
 CELL_SIZE = 10       # Size of each cell in pixels
 GRID_WIDTH = 80      # Number of cells horizontally
 GRID_HEIGHT = 60     # Number of cells vertically
-FPS = 10             # Frames per second (simulation speed)
+FPS = 10             # Generations per second (T toggles unthrottled turbo)
+DISPLAY_FPS = 60     # Frames drawn per second
 
 # Cell Types
 CELL_EMPTY = 0
@@ -24,6 +27,11 @@ TYPE_COLORS = {
 }
 COLOR_TEXT = (255, 0, 0)
 
+# Palette renderer for draw_grid(), when NumPy is available
+_renderer = None
+if render.np is not None:
+    _renderer = render.GridRenderer(CELL_SIZE, TYPE_COLORS, COLOR_BG, COLOR_GRID)
+
 
 def init_grid(randomize=True):
     grid = [[CELL_EMPTY for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
@@ -35,6 +43,10 @@ def init_grid(randomize=True):
 
 
 def draw_grid(surface, grid):
+    if _renderer is not None:
+        _renderer.draw(surface, grid)
+        return
+    import pygame
     surface.fill(COLOR_BG)
     for y in range(GRID_HEIGHT):
         for x in range(GRID_WIDTH):
@@ -50,50 +62,44 @@ def draw_grid(surface, grid):
         pygame.draw.line(surface, COLOR_GRID, (0, y), (GRID_WIDTH * CELL_SIZE, y))
 
 
-def count_alive(grid, x, y):
-    alive = 0
-    for j in (-1, 0, 1):
-        for i in (-1, 0, 1):
-            if not (i == 0 and j == 0):
-                xi = (x + i) % GRID_WIDTH
-                yj = (y + j) % GRID_HEIGHT
-                if grid[yj][xi] != CELL_EMPTY:
-                    alive += 1
-    return alive
+# Dead cells with exactly 3 live neighbors are born, by alive-neighbor count
+BIRTHS = flatgrid.translation(lambda neighbors: CELL_NORMAL if neighbors == 3 else CELL_EMPTY)
+_board = None  # flat buffers, reused while the grid size stays the same
 
 
 def update(grid):
-    new = [[CELL_EMPTY for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
-    for y in range(GRID_HEIGHT):
-        for x in range(GRID_WIDTH):
-            cell = grid[y][x]
-            neighbors = count_alive(grid, x, y)
-            if cell == CELL_IMMORTAL:
-                new[y][x] = CELL_IMMORTAL
-            elif cell == CELL_EPHEMERAL:
-                # Ephemeral always dies
-                new[y][x] = CELL_EMPTY
-            elif cell == CELL_NORMAL:
-                # Standard life rules
-                if neighbors < 2 or neighbors > 3:
-                    new[y][x] = CELL_EMPTY
-                else:
-                    new[y][x] = CELL_NORMAL
-            else:  # Dead cell
-                if neighbors == 3:
-                    new[y][x] = CELL_NORMAL
-    return new
+    global _board
+    board = _board = flatgrid.reuse(_board, GRID_WIDTH, GRID_HEIGHT)
+    board.load(grid)
+    cells, new = board.cells, board.next
+    live = board.live()
+    neighbors = board.count()
+    # Dead cells first, all at once; every live cell is overwritten below
+    new[:] = neighbors.translate(BIRTHS)
+    for i in live:
+        cell = cells[i]
+        if cell == CELL_IMMORTAL:
+            new[i] = CELL_IMMORTAL
+        elif cell == CELL_EPHEMERAL:
+            # Ephemeral always dies
+            new[i] = CELL_EMPTY
+        else:
+            # Standard life rules
+            new[i] = CELL_NORMAL if neighbors[i] in (2, 3) else CELL_EMPTY
+    return board.to_grid(new)
 
 
 def main():
+    import pygame
     pygame.init()
     screen = pygame.display.set_mode((GRID_WIDTH * CELL_SIZE, GRID_HEIGHT * CELL_SIZE))
     pygame.display.set_caption("GPT's Game of Life")
     clock = pygame.time.Clock()
     font = pygame.font.SysFont(None, 24)
 
-    grid = init_grid(randomize=True)
-    paused = False
+    # Steps on its own thread; clicks and R/C are applied between generations
+    worker = SimulationWorker(init_grid(randomize=True), update, FPS)
+    worker.start()
     running = True
     placement_type = CELL_NORMAL
 
@@ -103,11 +109,13 @@ def main():
                 running = False
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_r:
-                    grid = init_grid(randomize=True)
+                    worker.replace(init_grid(randomize=True))
                 elif event.key == pygame.K_c:
-                    grid = init_grid(randomize=False)
+                    worker.replace(init_grid(randomize=False))
                 elif event.key == pygame.K_SPACE:
-                    paused = not paused
+                    worker.paused = not worker.paused
+                elif event.key == pygame.K_t:
+                    worker.turbo = not worker.turbo
                 elif event.key == pygame.K_1:
                     placement_type = CELL_NORMAL
                 elif event.key == pygame.K_2:
@@ -119,24 +127,20 @@ def main():
                     mx, my = pygame.mouse.get_pos()
                     gx, gy = mx // CELL_SIZE, my // CELL_SIZE
                     if 0 <= gx < GRID_WIDTH and 0 <= gy < GRID_HEIGHT:
-                        if grid[gy][gx] == placement_type:
-                            grid[gy][gx] = CELL_EMPTY
-                        else:
-                            grid[gy][gx] = placement_type
+                        worker.toggle(gx, gy, placement_type)
 
-        draw_grid(screen, grid)
+        _, grid = worker.latest()
+        rects = render.draw_changes(_renderer, screen, grid, draw_grid)
         # UI overlay
         status = f"Type: {placement_type} (1=Normal, 2=Immortal, 3=Ephemeral) | " + \
-                 ("Paused" if paused else "Running")
+                 ("Paused" if worker.paused else "Turbo" if worker.turbo else "Running")
         text = font.render(status, True, COLOR_TEXT)
-        screen.blit(text, (10, 10))
-
-        pygame.display.flip()
+        text_rect = screen.blit(text, (10, 10))
 
-        if not paused:
-            grid = update(grid)
-        clock.tick(FPS)
+        render.present(_renderer, rects, text_rect)
+        clock.tick(DISPLAY_FPS)
 
+    worker.stop()
     pygame.quit()
     sys.exit()
 
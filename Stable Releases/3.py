@@ -1,12 +1,15 @@
-import pygame
 import sys
 import random
 
+from life import flatgrid, render
+from life.worker import SimulationWorker
+
 # Configuration
 CELL_SIZE = 10       # Size of each cell in pixels
 GRID_WIDTH = 80      # Number of cells horizontally
 GRID_HEIGHT = 60     # Number of cells vertically
-FPS = 10             # Frames per second (simulation speed)
+FPS = 10             # Generations per second (T toggles unthrottled turbo)
+DISPLAY_FPS = 60     # Frames drawn per second
 
 # Cell Types
 CELL_EMPTY = 0
@@ -28,6 +31,11 @@ TYPE_COLORS = {
 }
 COLOR_TEXT = (255, 0, 0)
 
+# Palette renderer for draw_grid(), when NumPy is available
+_renderer = None
+if render.np is not None:
+    _renderer = render.GridRenderer(CELL_SIZE, TYPE_COLORS, COLOR_BG, COLOR_GRID)
+
 
 def init_grid(randomize=True):
     grid = [[CELL_EMPTY for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
@@ -39,6 +47,10 @@ def init_grid(randomize=True):
 
 
 def draw_grid(surface, grid):
+    if _renderer is not None:
+        _renderer.draw(surface, grid)
+        return
+    import pygame
     surface.fill(COLOR_BG)
     for y in range(GRID_HEIGHT):
         for x in range(GRID_WIDTH):
@@ -54,77 +66,83 @@ def draw_grid(surface, grid):
         pygame.draw.line(surface, COLOR_GRID, (0, y), (GRID_WIDTH * CELL_SIZE, y))
 
 
-def neighbors_coords(x, y):
-    for dy in (-1, 0, 1):
-        for dx in (-1, 0, 1):
-            if dx != 0 or dy != 0:
-                yield (x + dx) % GRID_WIDTH, (y + dy) % GRID_HEIGHT
+# Neighbor counts pack two numbers: alive (not empty) neighbors in the low
+# 4 bits, normal/immortal neighbors in the high 4 bits
+WEIGHTS = flatgrid.translation(
+    lambda cell: 0 if cell == CELL_EMPTY else 17 if cell in (CELL_NORMAL, CELL_IMMORTAL) else 1)
+# empty cell: birth if exactly 3 neighbors normal/immortal
+BIRTHS = flatgrid.translation(lambda counts: CELL_NORMAL if counts >> 4 == 3 else CELL_EMPTY)
+_board = None  # flat buffers, reused while the grid size stays the same
 
 
 def update(grid):
-    new = [[CELL_EMPTY for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
-    for y in range(GRID_HEIGHT):
-        for x in range(GRID_WIDTH):
-            cell = grid[y][x]
-            # count alive neighbors (not empty)
-            alive_neighbors = sum(1 for nx, ny in neighbors_coords(x, y) if grid[ny][nx] != CELL_EMPTY)
-
-            if cell == CELL_IMMORTAL:
-                new[y][x] = CELL_IMMORTAL
-            elif cell == CELL_EPHEMERAL:
-                # ephemerals die
-                new[y][x] = CELL_EMPTY
-            elif cell == CELL_VIRAL:
-                # remain viral and infect one random neighbor
-                new[y][x] = CELL_VIRAL
-                targets = [(nx, ny) for nx, ny in neighbors_coords(x, y) if grid[ny][nx] == CELL_EMPTY]
-                if targets:
-                    tx, ty = random.choice(targets)
-                    new[ty][tx] = CELL_VIRAL
-            elif cell == CELL_SHRINKER:
-                # kills all neighbors then disappears
-                for nx, ny in neighbors_coords(x, y):
-                    if grid[ny][nx] != CELL_EMPTY:
-                        new[ny][nx] = CELL_EMPTY
-                # shrinker itself vanishes
-                new[y][x] = CELL_EMPTY
-            elif cell == CELL_NORMAL:
-                # classic rules
-                if alive_neighbors in (2, 3):
-                    new[y][x] = CELL_NORMAL
-                else:
-                    new[y][x] = CELL_EMPTY
-            else:
-                # empty cell: birth if exactly 3 neighbors normal/immortal
-                normals = sum(1 for nx, ny in neighbors_coords(x, y) if grid[ny][nx] in (CELL_NORMAL, CELL_IMMORTAL))
-                if normals == 3:
-                    new[y][x] = CELL_NORMAL
-    return new
+    global _board
+    board = _board = flatgrid.reuse(_board, GRID_WIDTH, GRID_HEIGHT)
+    board.load(grid)
+    cells, new, neighbors = board.cells, board.next, board.neighbors
+    live = board.live()
+    counts = board.count(WEIGHTS)
+    # Empty cells first, all at once.  Cells are still processed in row order
+    # and a later write wins: a viral infection only sticks on an empty cell
+    # further along if that cell isn't born when its own turn comes.
+    births = counts.translate(BIRTHS)
+    new[:] = births
+    for i in live:
+        cell = cells[i]
+        if cell == CELL_IMMORTAL:
+            new[i] = CELL_IMMORTAL
+        elif cell == CELL_EPHEMERAL:
+            # ephemerals die
+            new[i] = CELL_EMPTY
+        elif cell == CELL_VIRAL:
+            # remain viral and infect one random neighbor
+            new[i] = CELL_VIRAL
+            targets = [j for j in neighbors[8 * i:8 * i + 8] if cells[j] == CELL_EMPTY]
+            if targets:
+                j = random.choice(targets)
+                if j < i or not births[j]:
+                    new[j] = CELL_VIRAL
+        elif cell == CELL_SHRINKER:
+            # kills all neighbors then disappears
+            for j in neighbors[8 * i:8 * i + 8]:
+                if cells[j] != CELL_EMPTY:
+                    new[j] = CELL_EMPTY
+            # shrinker itself vanishes
+            new[i] = CELL_EMPTY
+        else:
+            # classic rules
+            new[i] = CELL_NORMAL if counts[i] & 15 in (2, 3) else CELL_EMPTY
+    return board.to_grid(new)
 
 
 def main():
+    import pygame
     pygame.init()
     screen = pygame.display.set_mode((GRID_WIDTH * CELL_SIZE, GRID_HEIGHT * CELL_SIZE))
     pygame.display.set_caption("GPT's Game of Life")
     clock = pygame.time.Clock()
     font = pygame.font.SysFont(None, 24)
 
-    grid = init_grid(randomize=True)
-    paused = False
+    # Steps on its own thread; clicks and R/C are applied between generations
+    worker = SimulationWorker(init_grid(randomize=True), update, FPS)
+    worker.start()
     placement_type = CELL_NORMAL
 
     while True:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                worker.stop()
                 pygame.quit()
                 sys.exit()
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_r:
-                    grid = init_grid(randomize=True)
+                    worker.replace(init_grid(randomize=True))
                 elif event.key == pygame.K_c:
-                    grid = init_grid(randomize=False)
+                    worker.replace(init_grid(randomize=False))
                 elif event.key == pygame.K_SPACE:
-                    paused = not paused
+                    worker.paused = not worker.paused
+                elif event.key == pygame.K_t:
+                    worker.turbo = not worker.turbo
                 elif event.key in (pygame.K_1, pygame.K_2, pygame.K_3,
                                    pygame.K_4, pygame.K_5):
                     placement_type = int(event.unicode)
@@ -132,21 +150,18 @@ def main():
                 mx, my = pygame.mouse.get_pos()
                 gx, gy = mx // CELL_SIZE, my // CELL_SIZE
                 if 0 <= gx < GRID_WIDTH and 0 <= gy < GRID_HEIGHT:
-                    if grid[gy][gx] == placement_type:
-                        grid[gy][gx] = CELL_EMPTY
-                    else:
-                        grid[gy][gx] = placement_type
-
-        draw_grid(screen, grid)
-        # simple overlay: type number and paused/running
-        label = f"{placement_type} | {'Paused' if paused else 'Running'}"
+                    worker.toggle(gx, gy, placement_type)
+
+        _, grid = worker.latest()
+        rects = render.draw_changes(_renderer, screen, grid, draw_grid)
+        # simple overlay: type number and paused/running/turbo
+        mode = 'Paused' if worker.paused else 'Turbo' if worker.turbo else 'Running'
+        label = f"{placement_type} | {mode}"
         text = font.render(label, True, COLOR_TEXT)
-        screen.blit(text, (10, 10))
+        text_rect = screen.blit(text, (10, 10))
 
-        pygame.display.flip()
-        if not paused:
-            grid = update(grid)
-        clock.tick(FPS)
+        render.present(_renderer, rects, text_rect)
+        clock.tick(DISPLAY_FPS)
 
 if __name__ == "__main__":
     main()
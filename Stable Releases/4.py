@@ -1,12 +1,32 @@
-import pygame
 import sys
 import random
 
+from life import flatgrid, render, rle
+from life.camera import Camera
+from life.profiler import FrameProfiler
+from life.worker import SimulationWorker
+
+try:
+    from life import cycles, objects, snapshot, vectorized
+    from life.history import History
+except ImportError:  # NumPy not installed, fall back to update()
+    cycles = objects = snapshot = vectorized = History = None
+
 # Configuration
 CELL_SIZE = 10
 GRID_WIDTH = 80
 GRID_HEIGHT = 60
-FPS = 10
+FPS = 10          # Generations per second (T toggles unthrottled turbo)
+DISPLAY_FPS = 60  # Frames drawn per second
+SEED = None  # Seed for the NumPy engine's VIRAL choices (None = random)
+PATTERN_FILE = "board.rle"    # S saves / L loads the board as multi-state RLE
+SNAPSHOT_FILE = "board.snap"  # F5 saves / F9 loads a binary snapshot (needs NumPy)
+STATUS_SECONDS = 4  # How long save/load messages stay on screen
+HISTORY_BUDGET = 64 * 2**20  # Bytes of compressed past generations kept for rewinding
+KEYFRAME_INTERVAL = 32       # Generations between full copies in the history
+TRACE_FILE = None  # Per-frame timings to "trace.csv", or "trace.json" for chrome://tracing
+# Window size; larger boards are explored with the wheel (zoom) and right-drag (pan)
+WINDOW_SIZE = (min(GRID_WIDTH*CELL_SIZE, 1200), min(GRID_HEIGHT*CELL_SIZE, 800))
 
 # Cell Types
 CELL_EMPTY     = 0
@@ -18,6 +38,10 @@ CELL_SHRINKER  = 5  # Kills neighbors then dies
 CELL_SPREADER  = 6  # Infects *all* empty neighbors then dies
 CELL_BLINKER   = 7  # Toggles each generation
 
+# Generations a cell's age counts before wrapping to 0 (1 for unlisted types).
+# A BLINKER is lit at age 0 and dark at age 1.
+AGE_PERIODS = {CELL_BLINKER: 2}
+
 # Colors
 COLOR_BG   = (10, 10, 10)
 COLOR_GRID = (40, 40, 40)
@@ -32,6 +56,12 @@ TYPE_COLORS = {
 }
 COLOR_TEXT = (255, 0, 0)
 
+# Palette renderers for draw_grid(), when NumPy is available
+_renderer = _view = None
+if render.np is not None:
+    _renderer = render.GridRenderer(CELL_SIZE, TYPE_COLORS, COLOR_BG, COLOR_GRID)
+    _view = render.ViewRenderer(TYPE_COLORS, COLOR_BG, COLOR_GRID)
+
 
 def init_grid(randomize=True):
     grid = [[CELL_EMPTY]*GRID_WIDTH for _ in range(GRID_HEIGHT)]
@@ -42,8 +72,29 @@ def init_grid(randomize=True):
     return grid
 
 
-def draw_grid(surface, grid):
+def draw_grid(surface, grid, camera=None, changed=None):
+    zoomed = camera is not None and not camera.is_home()
+    if _renderer is not None:
+        if zoomed:
+            # changed: flat indices of the cells changed since the last call, if known
+            _view.draw(surface, grid, camera, changed)
+        else:
+            _view.reset()
+            _renderer.draw(surface, grid)
+        return
+    import pygame
     surface.fill(COLOR_BG)
+    if zoomed:
+        # only the visible cells, one rect each
+        x0, y0, cols, rows = camera.visible()
+        size = max(int(camera.zoom), 1)
+        for y in range(y0, y0 + rows):
+            for x in range(x0, x0 + cols):
+                cell = grid[y % GRID_HEIGHT][x % GRID_WIDTH]
+                if cell != CELL_EMPTY:
+                    rect = pygame.Rect(camera.to_screen(x, y), (size, size))
+                    pygame.draw.rect(surface, TYPE_COLORS[cell], rect)
+        return
     for y in range(GRID_HEIGHT):
         for x in range(GRID_WIDTH):
             cell = grid[y][x]
@@ -58,124 +109,287 @@ def draw_grid(surface, grid):
         pygame.draw.line(surface, COLOR_GRID, (0, y), (GRID_WIDTH*CELL_SIZE, y))
 
 
-def neighbors_coords(x, y):
-    for dy in (-1,0,1):
-        for dx in (-1,0,1):
-            if dx!=0 or dy!=0:
-                yield (x+dx)%GRID_WIDTH, (y+dy)%GRID_HEIGHT
+# Neighbor counts: alive (not empty) in the low 4 bits, normals & immortals
+# in the high 4 bits
+WEIGHTS = flatgrid.translation(
+    lambda cell: 0 if cell == CELL_EMPTY else 17 if cell in (CELL_NORMAL, CELL_IMMORTAL) else 1)
+# Birth rules for all other: normals & immortals
+BIRTHS = flatgrid.translation(lambda counts: CELL_NORMAL if counts >> 4 == 3 else CELL_EMPTY)
+_board = None  # flat buffers, reused while the grid size stays the same
 
 
-def update(grid):
-    new = [[CELL_EMPTY]*GRID_WIDTH for _ in range(GRID_HEIGHT)]
-    for y in range(GRID_HEIGHT):
-        for x in range(GRID_WIDTH):
-            cell = grid[y][x]
-            alive = [(nx,ny) for nx,ny in neighbors_coords(x,y) if grid[ny][nx]!=CELL_EMPTY]
-            normals = sum(1 for nx,ny in neighbors_coords(x,y)
-                          if grid[ny][nx] in (CELL_NORMAL, CELL_IMMORTAL))
-
-            if cell == CELL_IMMORTAL:
-                new[y][x] = CELL_IMMORTAL
-
-            elif cell == CELL_EPHEMERAL:
-                # always dies
-                new[y][x] = CELL_EMPTY
-
-            elif cell == CELL_VIRAL:
-                new[y][x] = CELL_VIRAL
-                # infect one random empty neighbor
-                empties = [(nx,ny) for nx,ny in neighbors_coords(x,y) if grid[ny][nx]==CELL_EMPTY]
-                if empties:
-                    tx,ty = random.choice(empties)
-                    new[ty][tx] = CELL_VIRAL
-
-            elif cell == CELL_SHRINKER:
-                # kill all neighbors then self‐destruct
-                for nx,ny in neighbors_coords(x,y):
-                    new[ny][nx] = CELL_EMPTY
-                new[y][x] = CELL_EMPTY
-
-            elif cell == CELL_SPREADER:
-                # infect every empty neighbor then die
-                for nx,ny in neighbors_coords(x,y):
-                    if grid[ny][nx]==CELL_EMPTY:
-                        new[ny][nx] = CELL_SPREADER
-                # original dies
-                new[y][x] = CELL_EMPTY
-
-            elif cell == CELL_BLINKER:
-                # simply toggle off
-                new[y][x] = CELL_EMPTY
-
-            elif cell == CELL_NORMAL:
-                # classic life
-                if len(alive) in (2,3):
-                    new[y][x] = CELL_NORMAL
-                else:
-                    new[y][x] = CELL_EMPTY
-
-            else:
-                # Birth rules for all other: normals & immortals
-                if normals == 3:
-                    new[y][x] = CELL_NORMAL
-
-    # Now revive blinkers: any cell that was BLINKER becomes BLINKER again next gen
-    # (so they just flash off for one step and back on)
-    # We need to track where they were; simple hack: we could track prev grid
-    # but for demo, let's do: any cell that has 2+ live neighbors becomes BLINKER
-    # (you can tweak this as you see fit)
-    for y in range(GRID_HEIGHT):
-        for x in range(GRID_WIDTH):
-            if grid[y][x] == CELL_BLINKER:
-                new[y][x] = CELL_BLINKER
+def update(grid, ages=None):
+    """The next generation of a grid.
+
+    A grid alone has no ages, so its blinkers stay lit.  Given the grid of
+    cell ages too (see new_state()), dark blinkers aren't live neighbors and
+    ``(grid, ages)`` of the next generation is returned.
+    """
+    global _board
+    board = _board = flatgrid.reuse(_board, GRID_WIDTH, GRID_HEIGHT)
+    board.load(grid, ages)
+    cells, new, neighbors, age = board.cells, board.next, board.neighbors, board.ages
+    live = board.live()
+    dark = [i for i in live if cells[i] == CELL_BLINKER and age[i]]
+    lit = cells
+    if dark:
+        lit = bytearray(cells)
+        for i in dark:
+            lit[i] = CELL_EMPTY
+    counts = board.count(WEIGHTS, lit)
+    # Empty cells first, all at once.  Cells are still processed in row order
+    # and a later write wins, so a neighbor write only sticks on an empty cell
+    # further along if that cell isn't born when its own turn comes.
+    births = counts.translate(BIRTHS)
+    new[:] = births
+    for i in live:
+        cell = cells[i]
+
+        if cell == CELL_IMMORTAL:
+            new[i] = CELL_IMMORTAL
+
+        elif cell == CELL_EPHEMERAL:
+            # always dies
+            new[i] = CELL_EMPTY
+
+        elif cell == CELL_VIRAL:
+            new[i] = CELL_VIRAL
+            # infect one random empty neighbor
+            empties = [j for j in neighbors[8*i:8*i+8] if cells[j]==CELL_EMPTY]
+            if empties:
+                j = random.choice(empties)
+                if j < i or not births[j]:
+                    new[j] = CELL_VIRAL
+
+        elif cell == CELL_SHRINKER:
+            # kill all neighbors then self‐destruct
+            for j in neighbors[8*i:8*i+8]:
+                if j < i or cells[j] or not births[j]:
+                    new[j] = CELL_EMPTY
+            new[i] = CELL_EMPTY
+
+        elif cell == CELL_SPREADER:
+            # infect every empty neighbor then die
+            for j in neighbors[8*i:8*i+8]:
+                if cells[j]==CELL_EMPTY and (j < i or not births[j]):
+                    new[j] = CELL_SPREADER
+            # original dies
+            new[i] = CELL_EMPTY
+
+        elif cell == CELL_BLINKER:
+            # stays put; its age says whether it's lit
+            new[i] = CELL_BLINKER
+
+        else:
+            # classic life
+            new[i] = CELL_NORMAL if counts[i] & 15 in (2,3) else CELL_EMPTY
+
+    # Blinkers can't be overwritten by their neighbors either
+    for i in live:
+        if cells[i] == CELL_BLINKER:
+            new[i] = CELL_BLINKER
 
-    return new
+    if ages is None:
+        return board.to_grid(new)
+    # Cells that kept their type grow older, everything else starts at 0
+    new_ages = bytearray(board.size)
+    for i in live:
+        period = AGE_PERIODS.get(cells[i], 1)
+        if period > 1 and new[i] == cells[i]:
+            new_ages[i] = (age[i] + 1) % period
+    return board.to_grid(new), board.to_grid(new_ages)
+
+
+def new_state(grid):
+    """The simulation state of a grid: its cell types and ages (all 0).
+
+    A uint8 array of shape (2, GRID_HEIGHT, GRID_WIDTH) with NumPy, else a
+    pair of list-of-lists grids.
+    """
+    if vectorized is not None:
+        return vectorized.typed_state(grid)
+    return [[list(row) for row in grid], [[0]*GRID_WIDTH for _ in range(GRID_HEIGHT)]]
+
+
+def visible(state):
+    """The grid to draw: the cell types, with dark blinkers left out."""
+    if not isinstance(state, list):
+        return vectorized.visible(state)
+    types, ages = state
+    return [[CELL_EMPTY if cell == CELL_BLINKER and age else cell
+             for cell, age in zip(row, age_row)] for row, age_row in zip(types, ages)]
+
+
+def toggle_cell(state, x, y, cell_type):
+    """A click: set (x, y) to a new cell of cell_type, or clear it if it already is one."""
+    types, ages = state[0], state[1]
+    types[y][x] = CELL_EMPTY if types[y][x] == cell_type else cell_type
+    ages[y][x] = 0
+
+
+def next_generation(state, rng, out=None):
+    """Advance the state one generation, using the NumPy engine when available.
+
+    The NumPy engine writes into ``out`` if given.
+    """
+    if vectorized is not None:
+        return vectorized.step_typed_state(state, rng, out)
+    return list(update(*state))
+
+
+def save_board(grid, path, generation=0):
+    """Save the grid as RLE (.rle files) or as a binary snapshot.
+
+    Raises OSError if the file can't be written, ValueError for a snapshot
+    without NumPy.
+    """
+    if path.endswith(".rle"):
+        rle.save(path, grid)
+    elif snapshot is not None:
+        snapshot.save(path, grid, generation)
+    else:
+        raise ValueError("snapshots need NumPy")
+
+
+def load_board(path):
+    """Load an RLE file or snapshot, centered on an empty grid.
+
+    A snapshot is loaded straight into a NumPy board.  Raises OSError or
+    ValueError if the file can't be read, or for a snapshot without NumPy.
+    """
+    if path.endswith(".rle"):
+        pattern, _ = rle.load(path)
+        return rle.place(pattern, GRID_WIDTH, GRID_HEIGHT)
+    if snapshot is None:
+        raise ValueError("snapshots need NumPy")
+    return snapshot.load_centered(path, GRID_WIDTH, GRID_HEIGHT)[0]
 
 
 def main():
+    import pygame
     pygame.init()
-    screen = pygame.display.set_mode((GRID_WIDTH*CELL_SIZE, GRID_HEIGHT*CELL_SIZE))
+    screen = pygame.display.set_mode(WINDOW_SIZE)
     pygame.display.set_caption("Enhanced Game of Life")
     clock = pygame.time.Clock()
     font = pygame.font.SysFont(None, 24)
 
-    grid = init_grid()
-    paused = False
+    # F3 shows frame timings, gens/s, the cell census and the objects on the board
+    profiler = FrameProfiler(trace=TRACE_FILE)
+    census = objects.ObjectCensus() if objects else None
+    show_stats = False
+
+    rng = vectorized.make_rng(SEED) if vectorized is not None else None
+    # Spots still lifes and oscillators; VIRAL cells move at random, so never repeat
+    detector = cycles.CycleDetector(random_states=(CELL_VIRAL,)) if cycles else None
+    step = profiler.timed("update", lambda state, out: next_generation(state, rng, out))
+    history = History(HISTORY_BUDGET, KEYFRAME_INTERVAL) if History else None
+    # With NumPy the worker also diffs each generation, for the zoomed-out density map
+    changes = vectorized.changed_cells if vectorized is not None else None
+    worker = SimulationWorker(new_state(init_grid()), step, FPS, detector, history=history,
+                              edit=toggle_cell, reuse=True, changes=changes)
+    worker.start()
     placement_type = CELL_NORMAL
+    # Without NumPy every visible cell is drawn on its own, so no zooming out
+    camera = Camera(WINDOW_SIZE, (GRID_WIDTH, GRID_HEIGHT), CELL_SIZE,
+                    min_zoom=None if _renderer is not None else 1)
+    status, status_until = None, 0  # result of the last save or load
 
     while True:
         for ev in pygame.event.get():
             if ev.type == pygame.QUIT:
+                worker.stop()
+                profiler.close()
                 pygame.quit()
                 sys.exit()
             elif ev.type == pygame.KEYDOWN:
                 if ev.key == pygame.K_r:
-                    grid = init_grid(True)
+                    worker.replace(new_state(init_grid(True)))
                 elif ev.key == pygame.K_c:
-                    grid = init_grid(False)
+                    worker.replace(new_state(init_grid(False)))
+                elif ev.key in (pygame.K_s, pygame.K_F5):
+                    # cell types only; ages start again at 0 when loaded
+                    generation, state = worker.latest()
+                    path = PATTERN_FILE if ev.key == pygame.K_s else SNAPSHOT_FILE
+                    try:
+                        save_board(state[0], path, generation)
+                        status = f"Saved {path}"
+                    except (OSError, ValueError) as e:
+                        status = f"Could not save {path}: {e}"
+                    status_until = pygame.time.get_ticks() + STATUS_SECONDS * 1000
+                elif ev.key in (pygame.K_l, pygame.K_F9):
+                    path = PATTERN_FILE if ev.key == pygame.K_l else SNAPSHOT_FILE
+                    try:
+                        worker.replace(new_state(load_board(path)))
+                        status = f"Loaded {path}"
+                    except (OSError, ValueError) as e:
+                        status = f"Could not load {path}: {e}"
+                    status_until = pygame.time.get_ticks() + STATUS_SECONDS * 1000
                 elif ev.key == pygame.K_SPACE:
-                    paused = not paused
+                    worker.paused = not worker.paused
+                elif ev.key == pygame.K_t:
+                    worker.turbo = not worker.turbo
+                elif ev.key == pygame.K_h:
+                    camera.home()
+                elif ev.key == pygame.K_F3:
+                    show_stats = not show_stats
+                elif ev.key == pygame.K_RIGHT:
+                    # one generation, replayed from the history if it has it
+                    worker.paused = True
+                    worker.step_forward()
+                elif ev.key in (pygame.K_LEFT, pygame.K_PAGEUP, pygame.K_PAGEDOWN) and history:
+                    generation, _ = worker.latest()
+                    jump = {pygame.K_LEFT: -1, pygame.K_PAGEUP: -100, pygame.K_PAGEDOWN: 100}
+                    worker.seek(generation + jump[ev.key])
+                elif ev.key in (pygame.K_HOME, pygame.K_END) and history:
+                    worker.seek(history.first if ev.key == pygame.K_HOME else history.last)
                 elif ev.key in (pygame.K_1, pygame.K_2, pygame.K_3,
                                 pygame.K_4, pygame.K_5,
                                 pygame.K_6, pygame.K_7):
                     placement_type = int(ev.unicode)
             elif ev.type == pygame.MOUSEBUTTONDOWN and ev.button == 1:
-                mx,my = pygame.mouse.get_pos()
-                gx,gy = mx//CELL_SIZE, my//CELL_SIZE
-                if grid[gy][gx] == placement_type:
-                    grid[gy][gx] = CELL_EMPTY
-                else:
-                    grid[gy][gx] = placement_type
-
-        draw_grid(screen, grid)
-        label = f"Type {placement_type} | {'Paused' if paused else 'Running'}"
+                gx,gy = camera.to_cell(pygame.mouse.get_pos())
+                # applied by the simulation thread between generations
+                worker.toggle(gx, gy, placement_type)
+            elif ev.type == pygame.MOUSEWHEEL:
+                camera.zoom_at(pygame.mouse.get_pos(), ev.y)
+            elif ev.type == pygame.MOUSEMOTION and (ev.buttons[1] or ev.buttons[2]):
+                camera.pan(*ev.rel)
+        profiler.lap("events")
+
+        # Zoomed or panned views are redrawn in full; zoomed out, only the
+        # squares of the cells changed since last frame are recounted.
+        generation, state, changed = worker.latest_changes()
+        grid = visible(state)
+        zoomed = not camera.is_home()
+        rects = render.draw_changes(
+            _renderer, screen, grid,
+            lambda surface, grid: draw_grid(surface, grid, camera, changed), zoomed)
+        mode = 'Paused' if worker.paused else 'Turbo' if worker.turbo else 'Running'
+        label = f"Type {placement_type} | {mode} | Gen {generation}"
+        if worker.cycle is not None:
+            onset, period = worker.cycle
+            label += f" | Period {period} since gen {onset}"
+        if worker.paused and history:
+            label += f" | History {history.first}-{history.last}"
+        if status is not None and pygame.time.get_ticks() < status_until:
+            label += f" | {status}"
         text = font.render(label, True, COLOR_TEXT)
-        screen.blit(text, (10,10))
+        overlays = [screen.blit(text, (10,10))]
+        if show_stats:
+            lines = profiler.lines()
+            if census is not None:
+                with profiler.phase("objects"):
+                    census.update(grid)
+                lines.append(f"{len(census)} objects: {objects.summary(census.counts, 4)}")
+            for i, line in enumerate(lines):
+                text = font.render(line, True, COLOR_TEXT)
+                overlays.append(screen.blit(text, (10, 34 + 20*i)))
+        profiler.lap("draw")
 
-        pygame.display.flip()
-        if not paused:
-            grid = update(grid)
-        clock.tick(FPS)
+        render.present(_renderer, rects, *overlays)
+        profiler.lap("present")
+        clock.tick(DISPLAY_FPS)
+        profiler.end_frame(generation, grid if show_stats or profiler.tracing else None)
 
 
 if __name__ == "__main__":
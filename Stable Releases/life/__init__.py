@@ -0,0 +1,5 @@
+"""Shared engines and tools for the Stable Releases.
+
+The release scripts stay self-contained; they import from here only when
+the optional dependencies (NumPy) are available.
+"""
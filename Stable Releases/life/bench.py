@@ -0,0 +1,219 @@
+"""Benchmark every release's update(), NumPy step and draw_grid().
+
+Run from the ``Stable Releases`` directory::
+
+    python -m life.bench --output results.json
+    python -m life.bench --baseline results.json
+
+Each case is one release on one seeded board (size, density and mix of
+cell types).  update() (the release's own Python rules), next_generation()
+(the NumPy engine, 1.py and 4.py) and draw_grid() onto an offscreen surface
+are timed separately, taking the best of ``--repeats`` calls on the same
+board.  Boards too big for ``--max-draw-pixels`` at the release's
+``CELL_SIZE`` are drawn with smaller cells (``draw_cell_size`` in the
+results), down to one pixel per cell.  With ``--baseline`` every time is
+compared to the matching case of an earlier run and the exit status is 1
+if any is more than ``--tolerance`` slower.  Baselines are only meaningful
+on the machine that made them.
+"""
+import argparse
+import inspect
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+
+from life import vectorized
+from life.headless import RELEASES, load_release
+
+DEFAULT_SIZES = ((80, 60), (256, 256), (1024, 1024), (4096, 4096))
+DEFAULT_DENSITIES = (0.2, 0.5)
+# "normal": NORMAL cells only, like init_grid(); "types": live cells spread
+# evenly over all of the release's cell types.
+MIXES = ("normal", "types")
+METRICS = ("update", "step", "draw")
+
+
+def draw_cell_size(cell_size, width, height, max_pixels):
+    """The largest cell size up to ``cell_size`` that keeps the board within
+    ``max_pixels``, or None if not even one pixel per cell does."""
+    while cell_size > 1 and width * height * cell_size * cell_size > max_pixels:
+        cell_size -= 1
+    return cell_size if width * height * cell_size * cell_size <= max_pixels else None
+
+
+def best_time(function, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_case(release, width, height, density, mix, seed=0, repeats=3,
+             max_python_cells=256 * 256, max_draw_pixels=4096 * 4096):
+    """Time one case; returns a dict with seconds per call, None where skipped."""
+    module = load_release(release, width, height)
+    cell_size = draw_cell_size(module.CELL_SIZE, width, height, max_draw_pixels)
+    if cell_size is not None and cell_size != module.CELL_SIZE:
+        module = load_release(release, width, height, cell_size)
+    types = sorted(module.TYPE_COLORS) if mix == "types" and hasattr(module, "TYPE_COLORS") else [1]
+    board = vectorized.random_board(width, height, density, types, seed)
+    grid = board.tolist()
+    result = {"release": release, "width": width, "height": height,
+              "density": density, "mix": mix, "seed": seed}
+
+    result["update"] = None
+    if width * height <= max_python_cells:
+        result["update"] = best_time(lambda: module.update(grid), repeats)
+
+    result["step"] = None
+    if hasattr(module, "next_generation"):
+        # 4.py steps its typed state (cell types and ages), not a bare board
+        state = module.new_state(board) if hasattr(module, "new_state") else board
+        if "rng" in inspect.signature(module.next_generation).parameters:
+            rng = vectorized.make_rng(seed)
+            step = lambda: module.next_generation(state, rng)
+        else:
+            step = lambda: module.next_generation(state)
+        result["step"] = best_time(step, repeats)
+
+    result["draw"] = None
+    result["draw_cell_size"] = cell_size
+    if cell_size is not None:
+        size = (width * cell_size, height * cell_size)
+        try:
+            import pygame
+        except ImportError:
+            pygame = None
+        if pygame is not None:
+            surface = pygame.Surface(size)
+            # as the main loop holds it: arrays from the NumPy engine, else lists
+            drawn = board if hasattr(module, "next_generation") else grid
+            result["draw"] = best_time(lambda: module.draw_grid(surface, drawn), repeats)
+    return result
+
+
+def run(releases=RELEASES, sizes=DEFAULT_SIZES, densities=DEFAULT_DENSITIES,
+        mixes=MIXES, seed=0, repeats=3, max_python_cells=256 * 256,
+        max_draw_pixels=4096 * 4096, progress=None):
+    """Run every combination; returns the JSON-ready results."""
+    cases = []
+    for release in releases:
+        for width, height in sizes:
+            for density in densities:
+                # 1.py has no cell types, so both mixes are the same board
+                for mix in (mixes if release != "1" else mixes[:1]):
+                    case = run_case(release, width, height, density, mix, seed,
+                                    repeats, max_python_cells, max_draw_pixels)
+                    cases.append(case)
+                    if progress is not None:
+                        progress(case)
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "cases": cases,
+    }
+
+
+def case_key(case):
+    return (case["release"], case["width"], case["height"], case["density"],
+            case["mix"], case["seed"])
+
+
+def compare(results, baseline, tolerance=0.25):
+    """List (case, metric, new, old) for every time more than ``tolerance`` slower."""
+    old_cases = {case_key(case): case for case in baseline["cases"]}
+    regressions = []
+    for case in results["cases"]:
+        old = old_cases.get(case_key(case))
+        if old is None:
+            continue
+        for metric in METRICS:
+            if case.get(metric) is not None and old.get(metric) is not None:
+                if case[metric] > old[metric] * (1 + tolerance):
+                    regressions.append((case, metric, case[metric], old[metric]))
+    return regressions
+
+
+def describe(case):
+    return (f"release {case['release']} {case['width']}x{case['height']} "
+            f"density {case['density']} {case['mix']}")
+
+
+def format_case(case):
+    times = "  ".join(f"{metric} " + (f"{case[metric] * 1000:9.2f} ms"
+                                      if case[metric] is not None else "        -   ")
+                      for metric in METRICS)
+    cells = case.get("draw_cell_size")
+    return f"{describe(case):<40} {times}" + (f" ({cells} px cells)" if cells else "")
+
+
+def parse_size(text):
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height or width)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--releases", default=",".join(RELEASES),
+                        help="comma-separated releases (default: all)")
+    parser.add_argument("--sizes", default=",".join(f"{w}x{h}" for w, h in DEFAULT_SIZES),
+                        help="comma-separated WIDTHxHEIGHT grid sizes")
+    parser.add_argument("--densities", default=",".join(map(str, DEFAULT_DENSITIES)))
+    parser.add_argument("--mixes", default=",".join(MIXES),
+                        help="comma-separated cell mixes: " + ", ".join(MIXES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--max-python-cells", type=int, default=256 * 256,
+                        help="skip update() on bigger boards")
+    parser.add_argument("--max-draw-pixels", type=int, default=4096 * 4096,
+                        help="shrink the cells drawn by draw_grid() to stay within this, "
+                             "or skip it if one pixel per cell is too big")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results from this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown against the baseline (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+    args.releases = [release for release in args.releases.split(",") if release]
+    args.sizes = [parse_size(size) for size in args.sizes.split(",") if size]
+    args.densities = [float(density) for density in args.densities.split(",") if density]
+    args.mixes = [mix for mix in args.mixes.split(",") if mix]
+    for release in args.releases:
+        if release not in RELEASES:
+            parser.error(f"unknown release {release!r}")
+    for mix in args.mixes:
+        if mix not in MIXES:
+            parser.error(f"unknown mix {mix!r}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run(args.releases, args.sizes, args.densities, args.mixes, args.seed,
+                  args.repeats, args.max_python_cells, args.max_draw_pixels,
+                  progress=lambda case: print(format_case(case), flush=True))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    for case, metric, new, old in regressions:
+        print(f"REGRESSION {describe(case)} {metric}: "
+              f"{new * 1000:.2f} ms vs {old * 1000:.2f} ms ({new / old - 1:+.0%})")
+    if regressions:
+        return 1
+    print(f"no regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""Bit-packed engine for the 1.py rules.
+
+A board is a ``uint64`` array of shape ``(height, words)`` where bit ``i`` of
+word ``j`` holds cell ``x = 64 * j + i`` of that row, so a 10000 x 10000
+board takes 12.5 MB.  Bits past ``width`` in the last word are kept zero.
+Neighbors are counted with bitwise full adders on whole words and the edges
+wrap like ``get_neighbors()``.
+"""
+import numpy as np
+
+WORD = 64
+_ONE = np.uint64(1)
+_BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def words_for(width):
+    """Number of 64-bit words needed for a row of ``width`` cells."""
+    return -(-width // WORD)
+
+
+def pack(board):
+    """Pack a 0/1 board (any array-like indexed [y, x]) into words."""
+    alive = np.asarray(board) != 0
+    height, width = alive.shape
+    padded = np.zeros((height, words_for(width) * WORD), dtype=bool)
+    padded[:, :width] = alive
+    packed = np.packbits(padded, axis=1, bitorder="little")
+    return packed.view("<u8").astype(np.uint64)
+
+
+def unpack(words, width):
+    """Unpack words into a 0/1 uint8 board of the given width."""
+    as_bytes = np.ascontiguousarray(words, dtype="<u8").view(np.uint8)
+    return np.unpackbits(as_bytes, axis=1, bitorder="little")[:, :width]
+
+
+def from_grid(grid):
+    """Pack the list-of-lists ``grid`` of 1.py."""
+    return pack(grid)
+
+
+def to_grid(words, width):
+    """Unpack words into the list-of-lists ``grid`` of 1.py."""
+    return unpack(words, width).tolist()
+
+
+def population(words):
+    """Number of live cells on a packed board."""
+    as_bytes = np.ascontiguousarray(words).view(np.uint8)
+    return int(_BYTE_POPCOUNT[as_bytes].sum(dtype=np.int64))
+
+
+def random_board(width, height, density, rng, rows_per_chunk=1024):
+    """Packed random soup, generated a slice of rows at a time."""
+    words = np.empty((height, words_for(width)), dtype=np.uint64)
+    for top in range(0, height, rows_per_chunk):
+        bottom = min(top + rows_per_chunk, height)
+        words[top:bottom] = pack(rng.random((bottom - top, width)) < density)
+    return words
+
+
+def _last_word_mask(width):
+    used = width % WORD
+    return np.uint64((1 << used) - 1) if used else ~np.uint64(0)
+
+
+def _from_west(words, width):
+    """Each cell's west neighbor (x - 1), wrapped."""
+    shifted = words << _ONE
+    shifted[:, 1:] |= words[:, :-1] >> np.uint64(WORD - 1)
+    last = (width - 1) % WORD
+    shifted[:, 0] |= (words[:, -1] >> np.uint64(last)) & _ONE
+    shifted[:, -1] &= _last_word_mask(width)
+    return shifted
+
+
+def _from_east(words, width):
+    """Each cell's east neighbor (x + 1), wrapped."""
+    shifted = words >> _ONE
+    shifted[:, :-1] |= words[:, 1:] << np.uint64(WORD - 1)
+    last = (width - 1) % WORD
+    shifted[:, -1] |= (words[:, 0] & _ONE) << np.uint64(last)
+    return shifted
+
+
+def step(words, width):
+    """Compute the next generation of a packed board (B3/S23)."""
+    west = _from_west(words, width)
+    east = _from_east(words, width)
+
+    # Row sums: west + self + east for the rows above and below, and
+    # west + east for the cell's own row, as (twos, ones) bit planes.
+    ones3 = west ^ words ^ east
+    twos3 = (west & words) | (east & (west ^ words))
+    ones2 = west ^ east
+    twos2 = west & east
+    up_ones, up_twos = np.roll(ones3, 1, axis=0), np.roll(twos3, 1, axis=0)
+    down_ones, down_twos = np.roll(ones3, -1, axis=0), np.roll(twos3, -1, axis=0)
+
+    # Add the three rows; the count is kept modulo 8, which is enough
+    # because a count of 8 must not be mistaken for 2 or 3.
+    bit0 = up_ones ^ ones2 ^ down_ones
+    carry = (up_ones & ones2) | (down_ones & (up_ones ^ ones2))
+    twos = up_twos ^ twos2 ^ down_twos
+    fours = (up_twos & twos2) | (down_twos & (up_twos ^ twos2))
+    bit1 = twos ^ carry
+    bit2 = fours ^ (twos & carry)
+
+    # Alive next: count == 3, or count == 2 and alive now.
+    return bit1 & ~bit2 & (bit0 | words)
@@ -0,0 +1,75 @@
+"""Zoom and pan over a wrapping board.
+
+The camera only does the arithmetic between screen pixels and cells, so it
+works without NumPy or pygame.  life.render.ViewRenderer draws what it sees.
+"""
+import math
+
+# Pixels per cell the mouse wheel steps through.  Below 1 each screen pixel
+# covers a power-of-two square of cells.
+ZOOM_LEVELS = tuple(1 / 2 ** k for k in range(10, 0, -1)) + (
+    1, 2, 3, 4, 6, 8, 10, 12, 16, 24, 32, 48, 64)
+
+
+class Camera:
+    """A ``view_size`` pixel window onto a ``board_size`` cell torus.
+
+    ``zoom`` is pixels per cell and (x, y) is the cell under the top-left
+    corner of the view, fractional while panning.  Zooming out stops once
+    the whole board fits, or at ``min_zoom`` if given.
+    """
+
+    def __init__(self, view_size, board_size, zoom, min_zoom=None):
+        self.view_width, self.view_height = view_size
+        self.board_width, self.board_height = board_size
+        self.home_zoom = zoom
+        levels = sorted(set(ZOOM_LEVELS) | {zoom})
+        if min_zoom is None:
+            fit = min(self.view_width / self.board_width,
+                      self.view_height / self.board_height)
+            min_zoom = max([level for level in levels if level <= fit] or levels[:1])
+        self.levels = [level for level in levels if level >= min_zoom]
+        self.home()
+
+    def home(self):
+        """Back to the starting zoom with cell (0, 0) in the top-left corner."""
+        self.zoom = self.home_zoom
+        self.x = self.y = 0.0
+
+    def is_home(self):
+        """True if the view shows the whole board exactly as at the start."""
+        return (self.zoom == self.home_zoom and self.x == 0 and self.y == 0
+                and self.board_width * self.zoom <= self.view_width
+                and self.board_height * self.zoom <= self.view_height)
+
+    def zoom_at(self, pos, steps):
+        """Move ``steps`` zoom levels in (or out if negative), keeping the cell under pos."""
+        index = min(max(self.levels.index(self.zoom) + steps, 0), len(self.levels) - 1)
+        zoom = self.levels[index]
+        cell_x = self.x + pos[0] / self.zoom
+        cell_y = self.y + pos[1] / self.zoom
+        self.zoom = zoom
+        self.x = (cell_x - pos[0] / zoom) % self.board_width
+        self.y = (cell_y - pos[1] / zoom) % self.board_height
+
+    def pan(self, dx, dy):
+        """Drag the board by (dx, dy) pixels."""
+        self.x = (self.x - dx / self.zoom) % self.board_width
+        self.y = (self.y - dy / self.zoom) % self.board_height
+
+    def to_cell(self, pos):
+        """The board cell under screen position pos."""
+        x = math.floor(self.x + pos[0] / self.zoom) % self.board_width
+        y = math.floor(self.y + pos[1] / self.zoom) % self.board_height
+        return x, y
+
+    def to_screen(self, x, y):
+        """Screen position of the top-left corner of cell (x, y), not wrapped."""
+        return round((x - self.x) * self.zoom), round((y - self.y) * self.zoom)
+
+    def visible(self):
+        """``(x, y, columns, rows)`` of the cells the view touches, not wrapped."""
+        x, y = math.floor(self.x), math.floor(self.y)
+        columns = math.ceil(self.x - x + self.view_width / self.zoom)
+        rows = math.ceil(self.y - y + self.view_height / self.zoom)
+        return x, y, columns, rows
@@ -0,0 +1,84 @@
+"""Spot boards that repeat, using an incrementally updated board hash.
+
+The hash is Zobrist style: the XOR of one 64-bit value per live cell, drawn
+from the cell's position and type.  Going from one generation to the next
+only the changed cells are hashed out and back in.  A bounded table of
+recent hashes then tells whether a board was seen before, and when.
+
+Equal hashes are taken as equal boards; with 64 bits a false match is
+vanishingly unlikely.
+"""
+from collections import deque
+
+import numpy as np
+
+from life import vectorized
+
+
+def cell_hashes(ids, states):
+    """Hash values of cells with these flat ids and states; empty cells hash to 0."""
+    values = vectorized.mix(states.astype(np.uint64), ids.astype(np.uint64))
+    return np.where(states != 0, values, np.uint64(0))
+
+
+def board_hash(board):
+    """The hash of a whole board."""
+    flat = vectorized.to_array(board).ravel()
+    ids = np.flatnonzero(flat)
+    return int(np.bitwise_xor.reduce(cell_hashes(ids, flat[ids]), initial=np.uint64(0)))
+
+
+class CycleDetector:
+    """Follows the boards of a run and reports when one repeats.
+
+    Feed every generation to update().  Boards holding any of
+    ``random_states`` (4.py's VIRAL cells, whose moves depend on the rng)
+    never count as repeats, since the same board can go on differently.
+    """
+
+    def __init__(self, history=4096, random_states=()):
+        self.history = history
+        self.random_states = tuple(random_states)
+        self.reset()
+
+    def reset(self):
+        """Forget all boards, e.g. after the board was edited."""
+        self.hash = None
+        self.period = None
+        self.onset = None
+        self._board = None
+        self._seen = {}
+        self._order = deque()
+
+    def update(self, board, generation):
+        """Record ``board`` as ``generation``; returns the period if it repeats, else None.
+
+        Once a repeat is found ``period`` and ``onset`` (the generation the
+        repeating board first appeared) stay set until reset().
+        """
+        board = vectorized.to_array(board)
+        if self._board is None or board.shape != self._board.shape:
+            self.hash = board_hash(board)
+        else:
+            changed = np.flatnonzero(board != self._board)
+            if changed.size:
+                old = self._board.ravel()[changed]
+                new = board.ravel()[changed]
+                delta = np.bitwise_xor.reduce(
+                    cell_hashes(changed, old) ^ cell_hashes(changed, new),
+                    initial=np.uint64(0))
+                self.hash ^= int(delta)
+        self._board = board.copy()
+
+        if self.random_states and np.isin(board, self.random_states).any():
+            return None
+        first = self._seen.get(self.hash)
+        if first is not None:
+            if self.period is None:
+                self.period, self.onset = generation - first, first
+            return generation - first
+        self._seen[self.hash] = generation
+        self._order.append(self.hash)
+        if len(self._order) > self.history:
+            del self._seen[self._order.popleft()]
+        return None
@@ -0,0 +1,203 @@
+"""Run many random soups at once and collect per-soup statistics.
+
+Run from the ``Stable Releases`` directory::
+
+    python -m life.ensemble --release 4 --boards 10000 --types 1,4,5,6 \\
+        --output soups.csv
+
+Soups are stepped ``--batch`` at a time as one (B, H, W) stack, and batches
+are shared out over ``--processes`` worker processes.  Every soup has its
+own seed: board i starts from ``make_rng(seed + i)`` and draws its VIRAL
+keys from it, so a soup gives the same result alone or in any batch.
+
+A soup is finished when it repeats a board from the last ``--max-period``
+generations (still life, oscillator or empty board), or after
+``--max-generations``.  Finished soups leave the stack, so the rest step
+faster, and their summary row is written at once.  Soups with VIRAL cells
+never count as repeating, since their next move depends on the rng.
+Release 4 soups are typed states (cell types and ages, like 4.py), so
+blinkers blink and a board only repeats with its ages.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+
+import numpy as np
+
+from life import cycles, vectorized
+
+RULES = {"1": "classic", "4": "typed"}
+# Cell types counted in the summary rows, per rules.
+TYPES = {"classic": (1,), "typed": tuple(range(1, 8))}
+
+
+def _stack_hashes(boards, ids):
+    """Board hash (as in life.cycles) of every board (or typed state) in a stack."""
+    flat = boards.reshape(len(boards), -1)
+    return np.bitwise_xor.reduce(cycles.cell_hashes(ids, flat), axis=1)
+
+
+def run_batch(seeds, rules="typed", width=80, height=60, density=0.5, types=(1,),
+              max_generations=10000, max_period=16):
+    """Step one soup per seed together; yields a summary dict as each one finishes."""
+    seeds = list(seeds)
+    counted = TYPES[rules]
+    rngs = [vectorized.make_rng(seed) for seed in seeds]
+    boards = np.stack([vectorized.random_board(width, height, density, types, rng) for rng in rngs])
+    if rules == "typed":
+        boards = vectorized.typed_state(boards)
+    active = list(range(len(seeds)))
+    flat_ids = np.arange(boards[0].size, dtype=np.uint64)
+    grid_ids = vectorized.cell_ids(np.arange(height), np.arange(width), width)
+    # Before stepping to a generation, recent[:, k] is the hash of the board
+    # k + 1 generations back; only the first min(generation, max_period) are set.
+    recent = np.zeros((len(seeds), max_period), dtype=np.uint64)
+    recent[:, 0] = _stack_hashes(boards, flat_ids)
+    peaks = np.zeros((len(seeds), len(counted)), dtype=np.int64)
+
+    def census(stack):
+        if stack.ndim == 4:
+            stack = stack[:, 0]  # the types of typed states
+        return np.stack([(stack == cell).sum(axis=(1, 2)) for cell in counted], axis=1)
+
+    peaks = np.maximum(peaks, census(boards))
+    generation = 0
+    while active:
+        generation += 1
+        if rules == "classic":
+            boards = vectorized.step_classic(boards)
+        else:
+            keys = np.array([vectorized.generation_key(rngs[i]) for i in active],
+                            dtype=np.uint64)[:, None, None]
+            boards = vectorized.step_typed_state_region(boards, keys, grid_ids)
+        counts = census(boards)
+        peaks = np.maximum(peaks, counts)
+        hashes = _stack_hashes(boards, flat_ids)
+
+        known = min(generation, max_period)
+        matches = recent[:, :known] == hashes[:, None]
+        repeated = matches.any(axis=1)
+        if rules == "typed":
+            repeated &= ~(boards[:, 0] == vectorized.VIRAL).any(axis=(1, 2))
+        done = repeated | (generation >= max_generations)
+        recent = np.roll(recent, 1, axis=1)
+        recent[:, 0] = hashes
+
+        for row in np.flatnonzero(done).tolist():
+            period = int(np.argmax(matches[row])) + 1 if repeated[row] else None
+            summary = {
+                "seed": seeds[active[row]],
+                "status": ("empty" if not counts[row].any() else
+                           "still" if period == 1 else
+                           "oscillator" if period else "timeout"),
+                "generations": generation - period if period else generation,
+                "period": period,
+                "population": int(counts[row].sum()),
+            }
+            for index, cell in enumerate(counted):
+                summary[f"final_{cell}"] = int(counts[row, index])
+                summary[f"peak_{cell}"] = int(peaks[row, index])
+            yield summary
+
+        if done.any():
+            keep = ~done
+            boards, recent, peaks = boards[keep], recent[keep], peaks[keep]
+            active = [index for index, kept in zip(active, keep) if kept]
+
+
+def _run_shard(args):
+    seeds, options = args
+    return list(run_batch(seeds, **options))
+
+
+def run(release="4", boards=1000, batch=64, seed=0, processes=None, **options):
+    """Yield the summary of every soup, batch by batch, in any order."""
+    rules = RULES[release]
+    seeds = range(seed, seed + boards)
+    shards = [(list(seeds[i:i + batch]), dict(options, rules=rules))
+              for i in range(0, boards, batch)]
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        for shard in shards:
+            yield from run_batch(shard[0], **shard[1])
+        return
+    with multiprocessing.Pool(processes) as pool:
+        for rows in pool.imap_unordered(_run_shard, shards):
+            yield from rows
+
+
+class RowWriter:
+    """Writes summary rows as CSV, or as JSON lines if the path ends in .jsonl."""
+
+    def __init__(self, path):
+        self._file = open(path, "w", newline="") if path != "-" else sys.stdout
+        self._json = path.endswith(".jsonl")
+        self._csv = None
+
+    def write(self, row):
+        if self._json:
+            self._file.write(json.dumps(row) + "\n")
+        else:
+            if self._csv is None:
+                self._csv = csv.DictWriter(self._file, fieldnames=list(row))
+                self._csv.writeheader()
+            self._csv.writerow(row)
+        self._file.flush()
+
+    def close(self):
+        if self._file is not sys.stdout:
+            self._file.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--release", choices=sorted(RULES), default="4")
+    parser.add_argument("--boards", type=int, default=1000, help="number of soups")
+    parser.add_argument("--batch", type=int, default=64, help="soups stepped together")
+    parser.add_argument("--width", type=int, default=80)
+    parser.add_argument("--height", type=int, default=60)
+    parser.add_argument("--density", type=float, default=0.5,
+                        help="fraction of cells alive at the start")
+    parser.add_argument("--types", default="1",
+                        help="comma-separated cell types the live cells are drawn from")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first soup")
+    parser.add_argument("--max-generations", type=int, default=10000)
+    parser.add_argument("--max-period", type=int, default=16,
+                        help="longest oscillator period detected as stable")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes (default: all cores)")
+    parser.add_argument("--output", default="-", help="CSV or .jsonl file (default: stdout)")
+    args = parser.parse_args(argv)
+    args.types = tuple(int(cell) for cell in args.types.split(",") if cell)
+    if args.release == "1" and set(args.types) != {1}:
+        parser.error("the 1.py rules only have NORMAL cells")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    writer = RowWriter(args.output)
+    statuses = {}
+    lifespans = []
+    try:
+        for row in run(args.release, args.boards, args.batch, args.seed, args.processes,
+                       width=args.width, height=args.height, density=args.density,
+                       types=args.types, max_generations=args.max_generations,
+                       max_period=args.max_period):
+            writer.write(row)
+            statuses[row["status"]] = statuses.get(row["status"], 0) + 1
+            lifespans.append(row["generations"])
+    finally:
+        writer.close()
+    if lifespans:
+        summary = ", ".join(f"{count} {status}" for status, count in sorted(statuses.items()))
+        print(f"{len(lifespans)} soups: {summary}; "
+              f"mean lifespan {sum(lifespans) / len(lifespans):.1f} generations",
+              file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""Record a run to PNG frames, an animated GIF or a raw video stream.
+
+Run from the ``Stable Releases`` directory::
+
+    python -m life.export --release 4 --generations 1000 --width 200 \\
+        --height 150 --seed 1 --format gif --output run.gif
+    python -m life.export --release 1 --generations 5000 --format raw --output - \\
+        | ffmpeg -f rawvideo -pix_fmt rgb24 -s 320x240 -r 30 -i - run.mp4
+
+No window is opened and pygame is not imported.  The main thread steps the
+simulation; a rasterizer thread turns each board into a frame through the
+release's ``TYPE_COLORS`` palette; an encoder thread writes the frames.
+The stages are joined by bounded queues, so they overlap, and at most
+``--queue`` boards and frames are in flight however long the run is.  GIF
+frames are LZW-coded in ``--processes`` worker processes, since coding in
+Python would otherwise hold the GIL the other two stages need.  PNG
+and GIF frames stay palette-indexed, raw video is RGB.  Frames show what
+the release window would: release 4's dark blinkers are left out.
+"""
+import argparse
+import collections
+import multiprocessing
+import os
+import queue
+import struct
+import sys
+import threading
+import zlib
+
+import numpy as np
+
+from life import render
+from life.headless import RELEASES, load_release, make_engine
+
+FORMATS = ("png", "gif", "raw")
+
+
+def release_palette(module):
+    """The 256-color palette draw_grid() uses, as a (256, 3) uint8 array."""
+    colors = getattr(module, "TYPE_COLORS", None)
+    if colors is None:  # 1.py draws live cells in one color
+        colors = {1: module.COLOR_ALIVE_NEXT}
+    return np.array(render.palette(colors, module.COLOR_BG), dtype=np.uint8)
+
+
+class PngSequence:
+    """Palette PNG files ``frame_000000.png``, ... in a directory."""
+
+    mode = "indexed"
+
+    def __init__(self, directory, palette):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._plte = palette.tobytes()
+        self.count = 0
+
+    def write(self, frame):
+        height, width = frame.shape
+        # filter type 0 (none) in front of every row
+        rows = np.zeros((height, width + 1), dtype=np.uint8)
+        rows[:, 1:] = frame
+        header = struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0)
+        path = os.path.join(self.directory, f"frame_{self.count:06d}.png")
+        with open(path, "wb") as f:
+            f.write(b"\x89PNG\r\n\x1a\n")
+            for kind, data in ((b"IHDR", header), (b"PLTE", self._plte),
+                               (b"IDAT", zlib.compress(rows.tobytes(), 6)), (b"IEND", b"")):
+                f.write(struct.pack(">I", len(data)) + kind + data)
+                f.write(struct.pack(">I", zlib.crc32(kind + data)))
+        self.count += 1
+
+    def close(self):
+        pass
+
+
+class GifWriter:
+    """Looping animated GIF, written frame by frame.
+
+    Frames are LZW-coded by a pool of ``processes`` worker processes (default:
+    all cores), so coding neither holds the GIL of the stepping and
+    rasterizing threads nor waits for the frame before.  Up to two frames
+    per process are coded ahead of the file.
+    """
+
+    mode = "indexed"
+
+    def __init__(self, path, palette, fps=10, processes=None):
+        processes = processes or os.cpu_count() or 1
+        self._file = open(path, "wb")
+        self._palette = palette.tobytes()
+        self._delay = max(round(100 / fps), 1)
+        self._pool = multiprocessing.Pool(processes)
+        self._pending = collections.deque()
+        self._ahead = 2 * processes
+        self.count = 0
+
+    def write(self, frame):
+        self._pending.append((frame.shape, self._pool.apply_async(_lzw, (frame.tobytes(),))))
+        while len(self._pending) > self._ahead:
+            self._write_next()
+
+    def _write_next(self):
+        (height, width), result = self._pending.popleft()
+        data = result.get()
+        f = self._file
+        if not self.count:
+            # header, global 256-color table, loop forever
+            f.write(b"GIF89a" + struct.pack("<HHBBB", width, height, 0xF7, 0, 0))
+            f.write(self._palette)
+            f.write(b"\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00")
+        f.write(b"\x21\xf9\x04\x00" + struct.pack("<H", self._delay) + b"\x00\x00")
+        f.write(b"\x2c" + struct.pack("<HHHHB", 0, 0, width, height, 0))
+        f.write(b"\x08")
+        for start in range(0, len(data), 255):
+            block = data[start:start + 255]
+            f.write(bytes((len(block),)) + block)
+        f.write(b"\x00")
+        self.count += 1
+
+    def close(self):
+        try:
+            while self._pending:
+                self._write_next()
+            self._file.write(b"\x3b")
+        finally:
+            self._pool.terminate()
+            self._pool.join()
+            self._file.close()
+
+
+def _lzw(pixels, min_code_size=8):
+    """GIF flavored LZW compression of 8-bit pixels."""
+    clear, end = 1 << min_code_size, (1 << min_code_size) + 1
+    out = bytearray()
+    append = out.append
+    # The clear code starts the stream.  A string is looked up by the code
+    # of its prefix and its last pixel, as ``code << 8 | pixel``; ``word`` is
+    # the code of the longest string matched so far.
+    next_code, code_size = end + 1, min_code_size + 1
+    limit = 1 << code_size
+    bits, count = clear, code_size
+    table = {}
+    word = pixels[0] if pixels else None
+    for pixel in pixels[1:]:
+        key = word << 8 | pixel
+        code = table.get(key)
+        if code is not None:
+            word = code
+            continue
+        bits |= word << count
+        count += code_size
+        while count >= 8:
+            append(bits & 0xFF)
+            bits >>= 8
+            count -= 8
+        if next_code == 4096:
+            bits |= clear << count
+            count += code_size
+            table = {}
+            next_code, code_size = end + 1, min_code_size + 1
+            limit = 1 << code_size
+        else:
+            table[key] = next_code
+            if next_code == limit:
+                code_size += 1
+                limit <<= 1
+            next_code += 1
+        word = pixel
+    for code in (end,) if word is None else (word, end):
+        bits |= code << count
+        count += code_size
+    while count > 0:
+        append(bits & 0xFF)
+        bits >>= 8
+        count -= 8
+    return bytes(out)
+
+
+class RawWriter:
+    """Headerless rgb24 frames, e.g. for ``ffmpeg -f rawvideo``; "-" is stdout."""
+
+    mode = "rgb"
+
+    def __init__(self, path):
+        self._file = sys.stdout.buffer if path == "-" else open(path, "wb")
+        self.count = 0
+
+    def write(self, frame):
+        self._file.write(np.ascontiguousarray(frame).tobytes())
+        self.count += 1
+
+    def close(self):
+        self._file.flush()
+        if self._file is not sys.stdout.buffer:
+            self._file.close()
+
+
+class _Stage(threading.Thread):
+    """Applies ``work`` to every item of ``source``; None ends the stream."""
+
+    def __init__(self, name, work, source, sink, failed):
+        super().__init__(name=name, daemon=True)
+        self.work, self.source, self.sink, self.failed = work, source, sink, failed
+
+    def run(self):
+        try:
+            while (item := _get(self.source, self.failed)) is not None:
+                result = self.work(item)
+                if self.sink is not None:
+                    _put(self.sink, result, self.failed)
+        except BaseException as error:
+            self.failed.append(error)
+        finally:
+            if self.sink is not None:
+                _put(self.sink, None, self.failed)
+
+
+def _put(target, item, failed):
+    """Put into a bounded queue, giving up if a stage has failed."""
+    while not failed:
+        try:
+            target.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            pass
+
+
+def _get(source, failed):
+    """Get from a queue; None once a stage has failed."""
+    while not failed:
+        try:
+            return source.get(timeout=0.1)
+        except queue.Empty:
+            pass
+    return None
+
+
+def export(boards, writer, palette, scale=1, queue_size=8):
+    """Rasterize and write every board of an iterable, overlapping the stages.
+
+    Returns the number of frames written; an error in a stage is raised here.
+    """
+    lut = palette if writer.mode == "rgb" else None
+
+    def rasterize(board):
+        frame = np.asarray(board, dtype=np.uint8)
+        if scale > 1:
+            frame = frame.repeat(scale, axis=0).repeat(scale, axis=1)
+        return lut[frame] if lut is not None else frame
+
+    failed = []
+    board_queue, frame_queue = queue.Queue(queue_size), queue.Queue(queue_size)
+    stages = [_Stage("rasterize", rasterize, board_queue, frame_queue, failed),
+              _Stage("encode", writer.write, frame_queue, None, failed)]
+    for stage in stages:
+        stage.start()
+    try:
+        for board in boards:
+            if failed:
+                break
+            _put(board_queue, board, failed)
+    finally:
+        _put(board_queue, None, failed)
+        for stage in stages:
+            stage.join()
+        writer.close()
+    if failed:
+        raise failed[0]
+    return writer.count
+
+
+def run_boards(engine, generations, every=1):
+    """Yield a copy of the visible board every ``every`` generations, starting with the first."""
+    for generation in range(generations + 1):
+        if generation % every == 0:
+            board = engine.visible()
+            yield np.array(board, dtype=np.uint8) if not isinstance(board, list) else board
+        if generation < generations:
+            engine.step()
+
+
+def make_writer(kind, output, palette, fps, processes=None):
+    if kind == "png":
+        return PngSequence(output, palette)
+    if kind == "gif":
+        return GifWriter(output, palette, fps, processes)
+    return RawWriter(output)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--release", choices=RELEASES, default="4")
+    parser.add_argument("--generations", type=int, default=100)
+    parser.add_argument("--width", type=int, default=80)
+    parser.add_argument("--height", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--density", type=float, default=0.5,
+                        help="fraction of cells alive at the start")
+    parser.add_argument("--engine", default="auto",
+                        choices=("auto", "numpy", "tiled", "parallel", "python"))
+    parser.add_argument("--format", choices=FORMATS, default="gif")
+    parser.add_argument("--output", required=True,
+                        help="directory (png), file (gif) or file or - for stdout (raw)")
+    parser.add_argument("--scale", type=int, default=4, help="pixels per cell")
+    parser.add_argument("--every", type=int, default=1, help="keep every Nth generation")
+    parser.add_argument("--fps", type=float, default=10, help="GIF playback speed")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="GIF coding processes (default: all cores)")
+    parser.add_argument("--queue", type=int, default=8,
+                        help="boards and frames in flight between the stages")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    palette = release_palette(load_release(args.release))
+    engine = make_engine(args.release, args.engine, args.width, args.height,
+                         args.density, args.seed)
+    writer = make_writer(args.format, args.output, palette, args.fps, args.processes)
+    try:
+        frames = export(run_boards(engine, args.generations, args.every), writer, palette,
+                        args.scale, args.queue)
+    finally:
+        engine.close()
+    print(f"{frames} frames of {args.width * args.scale}x{args.height * args.scale} "
+          f"written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Flat byte boards for the releases' pure-Python update() functions.
+
+A FlatBoard holds the cells row by row in one ``bytearray`` (cell ``(x, y)``
+at index ``y * width + x``) and the wrapped indices of every cell's 8
+neighbors in a table built once per board size, in the order the
+releases' update() always visited them.  update() loads the grid into
+``cells`` (and cell ages into ``ages``) and writes the next generation
+into ``next``.  The buffers and the table are kept while the board size
+stays the same.  The grid still comes in and goes out as a list-of-lists,
+so every call copies it in and builds a new one.
+
+The Python loop only runs over live cells.  Neighbor counts of the whole
+board are summed at once with one byte per cell in a big integer (a count
+never exceeds 255, so no carry crosses into the next cell), and whole-board
+rules such as births are applied with ``bytes.translate``.  No dependencies.
+"""
+from array import array
+from itertools import compress
+
+# Neighbor offsets (dy, dx), in the order update() visits them.
+OFFSETS = [(dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dy or dx]
+
+
+def neighbor_table(width, height):
+    """Flat array of the 8 wrapped neighbor indices of every cell."""
+    table = array("L")
+    for y in range(height):
+        for x in range(width):
+            table.extend((y + dy) % height * width + (x + dx) % width for dy, dx in OFFSETS)
+    return table
+
+
+def translation(function):
+    """A 256-byte ``bytes.translate`` table mapping ``value`` to ``function(value)``."""
+    return bytes(function(value) & 0xFF for value in range(256))
+
+
+# Counts every non-empty cell once.
+ALIVE = translation(lambda cell: 1 if cell else 0)
+
+
+class FlatBoard:
+    """A ``width`` x ``height`` board as bytearrays of cells, ages and the next cells."""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.cells = bytearray(self.size)
+        self.next = bytearray(self.size)
+        self.ages = bytearray(self.size)
+        self._zeros = bytes(self.size)
+        self._neighbors = None
+
+    @property
+    def neighbors(self):
+        """The neighbor table: cell i's neighbors are ``neighbors[8*i:8*i+8]``."""
+        if self._neighbors is None:
+            self._neighbors = neighbor_table(self.width, self.height)
+        return self._neighbors
+
+    def load(self, grid, ages=None):
+        """Copy a list-of-lists grid into ``cells``, and its ages (or zeros) into ``ages``."""
+        width = self.width
+        for target, rows in ((self.cells, grid), (self.ages, ages)):
+            if rows is None:
+                target[:] = self._zeros
+                continue
+            for y, row in enumerate(rows):
+                target[y * width:(y + 1) * width] = bytes(row)
+
+    def to_grid(self, values=None):
+        """``cells`` (or another buffer of the board) as a new list-of-lists grid."""
+        values = self.cells if values is None else values
+        width = self.width
+        return [list(values[start:start + width]) for start in range(0, self.size, width)]
+
+    def live(self):
+        """Indices of the non-empty cells, in row order."""
+        return list(compress(range(self.size), self.cells))
+
+    def count(self, weights=ALIVE, cells=None):
+        """Sum of ``weights[cell]`` over the 8 neighbors of every cell, as bytes.
+
+        ``weights`` is a translate() table; 8 times its largest entry must
+        fit in a byte.  ``cells`` replaces the board's own cells.
+        """
+        width, height, size = self.width, self.height, self.size
+        values = (self.cells if cells is None else cells).translate(weights)
+        # one wrapped column on either side and one wrapped row above and below
+        stride = width + 2
+        padded = b"".join(values[start + width - 1:start + width] + values[start:start + width]
+                          + values[start:start + 1] for start in range(0, size, width))
+        padded = padded[-stride:] + padded + padded[:stride]
+        board = int.from_bytes(padded, "little")
+        rows = board + (board << 8) + (board >> 8)
+        total = rows + (rows << 8 * stride) + (rows >> 8 * stride) - board
+        total = (total & ((1 << 8 * len(padded)) - 1)).to_bytes(len(padded), "little")
+        return b"".join(total[start + 1:start + 1 + width]
+                        for start in range(stride, stride * (height + 1), stride))
+
+
+def reuse(board, width, height):
+    """``board`` if it has this size, else a new FlatBoard."""
+    if board is None or (board.width, board.height) != (width, height):
+        return FlatBoard(width, height)
+    return board
@@ -0,0 +1,284 @@
+"""Hashlife engine for the 1.py rules (B3/S23).
+
+The board is a quadtree of canonical nodes: equal subtrees are the same
+object, and the future of each node is memoized, so repetitive patterns can
+be advanced millions of generations in one call.
+
+Hashlife works on an unbounded plane, not on the ``GRID_WIDTH`` x
+``GRID_HEIGHT`` torus of the releases: a soup loaded with from_grid()
+evolves as if the grid had no edges, and to_grid() cuts a window back out.
+"""
+
+
+class Node:
+    """A 2**level square; level 0 nodes are single cells."""
+
+    __slots__ = ("level", "nw", "ne", "sw", "se", "population")
+
+    def __init__(self, level, nw, ne, sw, se, population):
+        self.level = level
+        self.nw, self.ne, self.sw, self.se = nw, ne, sw, se
+        self.population = population
+
+
+OFF = Node(0, None, None, None, None, 0)
+ON = Node(0, None, None, None, None, 1)
+
+# Roughly what one node costs with its table entries, for sizing max_nodes.
+NODE_BYTES = 250
+DEFAULT_MAX_NODES = 2_000_000
+
+
+class Hashlife:
+    """An unbounded board stepped with Hashlife.
+
+    ``max_nodes`` bounds the node table (about ``NODE_BYTES`` each).  Once
+    the table grows past it, also in the middle of an advance(), collect()
+    drops every node and memoized result not reachable from the board or
+    from the nodes the recursion is still working on.  A board that alone
+    needs more nodes raises the limit to twice what collect() kept, so it
+    isn't collected again on every new node.
+    """
+
+    def __init__(self, max_nodes=DEFAULT_MAX_NODES):
+        self.max_nodes = max_nodes
+        self.collections = 0
+        self._limit = max_nodes
+        self._nodes = {}
+        self._results = {}
+        self._empty = [OFF]
+        self._working = []  # nodes the advance() in progress still needs
+        self.clear()
+
+    # -- node table --------------------------------------------------------
+
+    def join(self, nw, ne, sw, se):
+        """Return the canonical node with the given quadrants."""
+        key = (nw, ne, sw, se)
+        node = self._nodes.get(key)
+        if node is None:
+            population = nw.population + ne.population + sw.population + se.population
+            node = Node(nw.level + 1, nw, ne, sw, se, population)
+            self._nodes[key] = node
+        return node
+
+    def empty(self, level):
+        """Return the canonical empty node of the given level."""
+        while len(self._empty) <= level:
+            smaller = self._empty[-1]
+            self._empty.append(self.join(smaller, smaller, smaller, smaller))
+        return self._empty[level]
+
+    def collect(self):
+        """Drop nodes and results that the current board no longer uses."""
+        live = set()
+        stack = [self.root] + self._working
+        while stack:
+            node = stack.pop()
+            if node.level == 0 or node in live:
+                continue
+            live.add(node)
+            stack.extend((node.nw, node.ne, node.sw, node.se))
+        self._nodes = {key: node for key, node in self._nodes.items() if node in live}
+        self._results = {key: node for key, node in self._results.items()
+                         if key[0] in live and node in live}
+        self._empty = [OFF]
+        self.collections += 1
+
+    def stats(self):
+        """Node table size, memoized results and collections so far."""
+        return {
+            "nodes": len(self._nodes),
+            "results": len(self._results),
+            "collections": self.collections,
+            "approx_bytes": len(self._nodes) * NODE_BYTES,
+        }
+
+    # -- board -------------------------------------------------------------
+
+    def clear(self):
+        """Empty the board and reset the generation counter."""
+        self.root = self.empty(3)
+        self.origin = (0, 0)
+        self.generation = 0
+
+    @property
+    def population(self):
+        return self.root.population
+
+    def from_grid(self, grid, x=0, y=0):
+        """Load a list-of-lists grid with its top-left cell at (x, y)."""
+        cells = [(x + gx, y + gy)
+                 for gy, row in enumerate(grid)
+                 for gx, cell in enumerate(row) if cell]
+        self.set_cells(cells)
+
+    def set_cells(self, cells):
+        """Replace the board with the given live (x, y) cells."""
+        self.generation = 0
+        if not cells:
+            self.root, self.origin = self.empty(3), (0, 0)
+            return
+        left = min(x for x, _ in cells)
+        top = min(y for _, y in cells)
+        span = max(max(x for x, _ in cells) - left, max(y for _, y in cells) - top) + 1
+        level = max(3, (span - 1).bit_length())
+        self.root = self._build(cells, level, left, top)
+        self.origin = (left, top)
+
+    def _build(self, cells, level, x, y):
+        if not cells:
+            return self.empty(level)
+        if level == 0:
+            return ON
+        half = 1 << (level - 1)
+        quads = ([], [], [], [])
+        for cell in cells:
+            quads[(cell[1] >= y + half) * 2 + (cell[0] >= x + half)].append(cell)
+        return self.join(self._build(quads[0], level - 1, x, y),
+                         self._build(quads[1], level - 1, x + half, y),
+                         self._build(quads[2], level - 1, x, y + half),
+                         self._build(quads[3], level - 1, x + half, y + half))
+
+    def cells(self):
+        """Yield the (x, y) of every live cell."""
+        stack = [(self.root, self.origin[0], self.origin[1])]
+        while stack:
+            node, x, y = stack.pop()
+            if node.population == 0:
+                continue
+            if node.level == 0:
+                yield x, y
+                continue
+            half = 1 << (node.level - 1)
+            stack.extend(((node.nw, x, y), (node.ne, x + half, y),
+                          (node.sw, x, y + half), (node.se, x + half, y + half)))
+
+    def to_grid(self, width, height, x=0, y=0):
+        """Cut the width x height window at (x, y) out as a list-of-lists grid."""
+        grid = [[0] * width for _ in range(height)]
+        stack = [(self.root, self.origin[0], self.origin[1])]
+        while stack:
+            node, nx, ny = stack.pop()
+            size = 1 << node.level
+            if (node.population == 0 or nx >= x + width or ny >= y + height
+                    or nx + size <= x or ny + size <= y):
+                continue
+            if node.level == 0:
+                grid[ny - y][nx - x] = 1
+                continue
+            half = size >> 1
+            stack.extend(((node.nw, nx, ny), (node.ne, nx + half, ny),
+                          (node.sw, nx, ny + half), (node.se, nx + half, ny + half)))
+        return grid
+
+    # -- stepping ----------------------------------------------------------
+
+    def advance(self, k):
+        """Advance the board by 2**k generations."""
+        while self.root.level < k + 2 or not self._is_padded(self.root):
+            self._expand()
+        self._expand()
+        self.root = self._advance(self.root, k)
+        # The result is the centre of the expanded root, i.e. the old root.
+        half = 1 << (self.root.level - 1)
+        self.origin = (self.origin[0] + half, self.origin[1] + half)
+        self.generation += 1 << k
+        self._check_nodes()
+
+    def step(self, generations):
+        """Advance the board by any number of generations."""
+        k = 0
+        while generations:
+            if generations & 1:
+                self.advance(k)
+            generations >>= 1
+            k += 1
+
+    def _check_nodes(self):
+        """collect() if the node table has grown past the limit."""
+        if len(self._nodes) > self._limit:
+            self.collect()
+            self._limit = max(self.max_nodes, 2 * len(self._nodes))
+
+    def _is_padded(self, node):
+        """True if only the centre half of the node has live cells."""
+        return node.population == self._centre(node).population
+
+    def _expand(self):
+        root = self.root
+        border = self.empty(root.level - 1)
+        self.root = self.join(self.join(border, border, border, root.nw),
+                              self.join(border, border, root.ne, border),
+                              self.join(border, root.sw, border, border),
+                              self.join(root.se, border, border, border))
+        half = 1 << (root.level - 1)
+        self.origin = (self.origin[0] - half, self.origin[1] - half)
+
+    def _centre(self, node):
+        return self.join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    def _advance(self, node, k):
+        """Centre half of a node advanced 2**k generations (k <= level - 2)."""
+        key = (node, k)
+        result = self._results.get(key)
+        if result is not None:
+            return result
+        self._check_nodes()
+        if node.population == 0:
+            result = self.empty(node.level - 1)
+        elif node.level == 2:
+            result = self._life_4x4(node)
+        else:
+            depth = len(self._working)
+            self._working.append(node)
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+            subs = [
+                nw,
+                self.join(nw.ne, ne.nw, nw.se, ne.sw),
+                ne,
+                self.join(nw.sw, nw.se, sw.nw, sw.ne),
+                self._centre(node),
+                self.join(ne.sw, ne.se, se.nw, se.ne),
+                sw,
+                self.join(sw.ne, se.nw, sw.se, se.sw),
+                se,
+            ]
+            self._working.extend(subs)
+            if k == node.level - 2:
+                # Full step: both halves of the time go through recursion.
+                subs = [self._keep(self._advance(sub, k - 1)) for sub in subs]
+                inner = k - 1
+            else:
+                subs = [self._keep(self._centre(sub)) for sub in subs]
+                inner = k
+            a, b, c, d, e, f, g, h, i = subs
+            quads = [self._keep(self._advance(self._keep(self.join(*quad)), inner))
+                     for quad in ((a, b, d, e), (b, c, e, f), (d, e, g, h), (e, f, h, i))]
+            result = self.join(*quads)
+            del self._working[depth:]
+        self._results[key] = result
+        return result
+
+    def _keep(self, node):
+        """Mark ``node`` as needed by the advance() in progress; returns it."""
+        self._working.append(node)
+        return node
+
+    def _life_4x4(self, node):
+        bits = [[0] * 4 for _ in range(4)]
+        for qy, qx, quad in ((0, 0, node.nw), (0, 2, node.ne),
+                             (2, 0, node.sw), (2, 2, node.se)):
+            bits[qy][qx] = quad.nw.population
+            bits[qy][qx + 1] = quad.ne.population
+            bits[qy + 1][qx] = quad.sw.population
+            bits[qy + 1][qx + 1] = quad.se.population
+        out = []
+        for y in (1, 2):
+            for x in (1, 2):
+                neighbors = sum(bits[y + dy][x + dx]
+                                for dy in (-1, 0, 1) for dx in (-1, 0, 1)
+                                if dy or dx)
+                alive = neighbors == 3 or (bits[y][x] and neighbors == 2)
+                out.append(ON if alive else OFF)
+        return self.join(*out)
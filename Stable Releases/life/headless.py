@@ -0,0 +1,322 @@
+"""Run a release's rules without a window and report throughput.
+
+Run from the ``Stable Releases`` directory::
+
+    python -m life.headless --release 4 --generations 500 --width 1000 \\
+        --height 1000 --seed 1 --density 0.3
+    python -m life.headless --release 1 --generations 1000 --seed 1 \\
+        --objects objects.jsonl
+
+``--objects`` writes the object census (see life.objects) of every
+generation as JSON lines; it is not counted in the timings.
+
+``--engine hashlife`` runs the 1.py rules with life.hashlife on an
+unbounded plane, and ``--jump N`` makes every step advance N generations
+at once::
+
+    python -m life.headless --release 1 --engine hashlife --width 200 \
+        --height 200 --seed 1 --generations 10 --jump 100000
+
+Release 4 steps a typed state (cell types and ages) like 4.py itself, so
+its blinkers blink in every engine.
+
+pygame is never imported; the release scripts only import it inside
+``draw_grid()`` and ``main()``.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+from life.hashlife import DEFAULT_MAX_NODES, Hashlife
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    from life import bitpack, objects, vectorized
+    from life.parallel import ParallelStepper
+    from life.sparse import SparseUniverse
+    from life.tiles import TiledStepper
+except ImportError:  # NumPy not installed, only the python engine works
+    bitpack = objects = vectorized = ParallelStepper = SparseUniverse = TiledStepper = None
+
+RELEASES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RELEASES = ("1", "2", "3", "4")
+
+
+def load_release(release, width=None, height=None, cell_size=None):
+    """Import ``<release>.py`` as a module, optionally resizing its grid and cells."""
+    path = os.path.join(RELEASES_DIR, f"{release}.py")
+    spec = importlib.util.spec_from_file_location(f"release{release}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if width is not None:
+        module.GRID_WIDTH = width
+    if height is not None:
+        module.GRID_HEIGHT = height
+    if cell_size is not None:
+        module.CELL_SIZE = cell_size
+        if getattr(module, "_renderer", None) is not None:
+            module._renderer.resize(cell_size)
+    return module
+
+
+def random_grid(width, height, density, seed):
+    """Soup of NORMAL cells, like ``init_grid(True)``.
+
+    With NumPy, a uint8 array drawn from ``make_rng(seed)`` (``seed`` may
+    be such a generator), so every engine starts from the same cells;
+    bitpack's random_board() draws them row by row.  Without NumPy, a
+    list-of-lists grid drawn from ``random.Random(seed)``.
+    """
+    if vectorized is not None:
+        rng = vectorized.make_rng(seed)
+        return (rng.random((height, width)) < density).astype(vectorized.np.uint8)
+    rand = random.Random(seed)
+    return [[1 if rand.random() < density else 0 for _ in range(width)]
+            for _ in range(height)]
+
+
+def peak_memory():
+    """Peak resident set size of this process in bytes, or None."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Engine:
+    """A soup and the functions to step and measure it.
+
+    step() replaces ``board`` with the next generation, population() counts
+    its live cells, visible() returns the board as a release window shows
+    it (``board`` may be a typed state), stats() returns engine-specific
+    measurements and close() releases worker processes or shared memory.
+    """
+
+    def __init__(self, name, board, step, population, stats=dict, close=None, visible=None):
+        self.name = name
+        self.board = board
+        self._step = step
+        self._population = population
+        self._visible = visible
+        self.stats = stats
+        self._close = close
+
+    def step(self):
+        self.board = self._step(self.board)
+
+    def population(self):
+        return self._population(self.board)
+
+    def visible(self):
+        return self.board if self._visible is None else self._visible(self.board)
+
+    def close(self):
+        if self._close is not None:
+            self._close()
+
+
+def make_engine(release, engine, width, height, density, seed, processes=None,
+                jump=1, max_nodes=DEFAULT_MAX_NODES):
+    """Return an Engine for a fresh soup; "auto" picks NumPy when possible.
+
+    Only the hashlife engine takes ``jump``, the generations per step().
+    """
+    rules = {"1": "classic", "4": "typed"}.get(release)
+    if engine == "auto":
+        engine = "numpy" if vectorized is not None and rules else "python"
+    if engine in ("bitpack", "hashlife") and rules != "classic":
+        raise ValueError(f"the {engine} engine only runs the 1.py rules")
+    if engine not in ("python", "hashlife") and vectorized is None:
+        raise ValueError(f"the {engine} engine needs NumPy")
+    if engine != "python" and rules is None:
+        raise ValueError(f"no NumPy engine for release {release}")
+    if jump != 1 and engine != "hashlife":
+        raise ValueError("only the hashlife engine jumps")
+
+    if engine == "hashlife":
+        # The soup starts on an infinite plane instead of the torus.
+        life = Hashlife(max_nodes)
+        grid = random_grid(width, height, density, seed)
+        life.from_grid(grid if isinstance(grid, list) else grid.tolist())
+
+        def step(life):
+            life.step(jump)
+            return life
+
+        stats = lambda: dict(life.stats(), jump=jump)
+        return Engine(engine, life, step, lambda life: life.population, stats)
+
+    if engine == "python":
+        module = load_release(release, width, height)
+        random.seed(seed)  # update() draws VIRAL targets from `random`
+        grid = random_grid(width, height, density, seed)
+        if vectorized is not None:
+            grid = grid.tolist()  # the NumPy engines' soup
+        population = lambda board: sum(1 for row in board for cell in row if cell)
+        if rules != "typed":
+            return Engine(engine, grid, module.update, population)
+        # [grid, ages], stepped with update(grid, ages)
+        state = [grid, [[0] * width for _ in range(height)]]
+        return Engine(engine, state, lambda state: list(module.update(*state)),
+                      lambda state: population(state[0]), visible=module.visible)
+
+    rng = vectorized.make_rng(seed)
+    if engine == "bitpack":
+        words = bitpack.random_board(width, height, density, rng)
+        step = lambda board: bitpack.step(board, width)
+        return Engine(engine, words, step, bitpack.population)
+
+    board = random_grid(width, height, density, rng)
+    visible = None
+    population = lambda board: int(vectorized.np.count_nonzero(board))
+    if rules == "typed":
+        board = vectorized.typed_state(board)
+        visible = vectorized.visible
+        population = lambda state: int(vectorized.np.count_nonzero(state[0]))
+    if engine == "tiled":
+        stepper = TiledStepper(board, rules, rng)
+        fractions = stepper.active_fractions
+        stats = lambda: {"active_fraction": sum(fractions) / max(len(fractions), 1)}
+        return Engine(engine, board, lambda board: stepper.step(), population, stats,
+                      visible=visible)
+    if engine == "parallel":
+        stepper = ParallelStepper(board, rules, rng, processes)
+        stats = lambda: {"processes": stepper.processes}
+        return Engine(engine, board, lambda board: stepper.step(), population, stats,
+                      stepper.close, visible)
+    if engine == "sparse":
+        # The soup starts on an infinite plane instead of the torus.
+        universe = SparseUniverse(rules, rng)
+        universe.from_grid(board)
+
+        def step(board):
+            universe.step()
+            return universe
+
+        stats = lambda: {"chunks": len(universe.chunks), "chunk_bytes": universe.nbytes}
+        return Engine(engine, universe, step, lambda universe: universe.population, stats)
+    if rules == "classic":
+        return Engine(engine, board, vectorized.step_classic, population)
+    return Engine(engine, board, lambda state: vectorized.step_typed_state(state, rng),
+                  population, visible=visible)
+
+
+def run(release="4", generations=100, width=80, height=60, seed=None,
+        density=0.5, engine="auto", processes=None, objects_path=None, jump=1,
+        max_nodes=DEFAULT_MAX_NODES):
+    """Simulate ``generations`` steps and return a dict of measurements.
+
+    With ``objects_path`` ("-" for stdout) the object census of every
+    generation is written there as JSON lines.  With the hashlife engine
+    every step advances ``jump`` generations.
+    """
+    if objects_path is not None and objects is None:
+        raise ValueError("the object census needs NumPy")
+    if objects_path is not None and engine in ("bitpack", "sparse", "hashlife"):
+        raise ValueError(f"no object census for the {engine} engine")
+    engine = make_engine(release, engine, width, height, density, seed, processes,
+                         jump, max_nodes)
+    census = output = None
+    if objects_path is not None:
+        census = objects.ObjectCensus()
+        output = sys.stdout if objects_path == "-" else open(objects_path, "w")
+
+    def count_objects(generation):
+        counts = census.update(engine.visible())
+        output.write(json.dumps({"generation": generation, "objects": len(census),
+                                 "counts": dict(counts.most_common())}) + "\n")
+
+    try:
+        if census is not None:
+            count_objects(0)
+        elapsed = 0.0
+        for generation in range(1, generations + 1):
+            start = time.perf_counter()
+            engine.step()
+            elapsed += time.perf_counter() - start
+            if census is not None:
+                count_objects(generation)
+
+        generations *= jump
+        result = {
+            "release": release,
+            "engine": engine.name,
+            "width": width,
+            "height": height,
+            "generations": generations,
+            "seconds": elapsed,
+            "gens_per_sec": generations / elapsed if elapsed else float("inf"),
+            "cells_per_sec": generations * width * height / elapsed if elapsed else float("inf"),
+            "population": engine.population(),
+            "peak_memory": peak_memory(),
+        }
+        result.update(engine.stats())
+        if census is not None:
+            result["objects"] = dict(census.counts.most_common())
+    finally:
+        engine.close()
+        if output is not None and output is not sys.stdout:
+            output.close()
+    return result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--release", choices=RELEASES, default="4")
+    parser.add_argument("--generations", type=int, default=100)
+    parser.add_argument("--width", type=int, default=80)
+    parser.add_argument("--height", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--density", type=float, default=0.5,
+                        help="fraction of cells alive at the start")
+    parser.add_argument("--engine", default="auto",
+                        choices=("auto", "numpy", "bitpack", "tiled", "parallel", "sparse",
+                                 "hashlife", "python"))
+    parser.add_argument("--jump", type=int, default=1, metavar="N",
+                        help="generations per step for --engine hashlife")
+    parser.add_argument("--max-nodes", type=int, default=DEFAULT_MAX_NODES,
+                        help="hashlife node table size that triggers a collection")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes for --engine parallel (default: all cores)")
+    parser.add_argument("--objects", metavar="PATH",
+                        help="write the object census of every generation here as JSON lines")
+    parser.add_argument("--json", action="store_true",
+                        help="print the result as one JSON object")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    result = run(args.release, args.generations, args.width, args.height,
+                 args.seed, args.density, args.engine, args.processes, args.objects,
+                 args.jump, args.max_nodes)
+    if args.json:
+        print(json.dumps(result))
+        return
+    memory = result["peak_memory"]
+    print(f"release {result['release']} ({result['engine']}) "
+          f"{result['width']}x{result['height']}, "
+          f"{result['generations']} generations in {result['seconds']:.3f}s")
+    print(f"  {result['gens_per_sec']:.1f} gens/s, "
+          f"{result['cells_per_sec']:.3g} cell updates/s")
+    print(f"  population {result['population']}, peak memory "
+          + (f"{memory / 2 ** 20:.1f} MiB" if memory is not None else "n/a"))
+    if "nodes" in result:
+        print(f"  {result['nodes']} hashlife nodes, {result['collections']} collections")
+    if "active_fraction" in result:
+        print(f"  {result['active_fraction']:.1%} of tiles active on average")
+    if "objects" in result:
+        print(f"  objects: {objects.summary(Counter(result['objects']))}")
+
+
+if __name__ == "__main__":
+    main()
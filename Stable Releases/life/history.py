@@ -0,0 +1,154 @@
+"""Rewind buffer of past generations.
+
+Generations are stored in segments: a full keyframe followed by up to
+``keyframe_interval - 1`` deltas, each the XOR of a board with the one
+before it.  Keyframes and deltas are zlib-compressed; a delta is mostly
+zeros, so it shrinks to roughly the size of the cells that changed.  Any
+retained generation is rebuilt from its segment's keyframe in at most
+``keyframe_interval - 1`` XORs, however long the history is.  When the
+compressed size goes over ``budget``, the oldest segments are dropped.
+"""
+import bisect
+import zlib
+
+import numpy as np
+
+
+class _Segment:
+    __slots__ = ("start", "shape", "keyframe", "deltas", "nbytes")
+
+    def __init__(self, start, board):
+        self.start = start
+        self.shape = board.shape
+        self.keyframe = zlib.compress(board.tobytes(), 1)
+        self.deltas = []
+        self.nbytes = len(self.keyframe)
+
+    @property
+    def stop(self):
+        return self.start + len(self.deltas) + 1
+
+
+class History:
+    """Boards of past generations, within ``budget`` compressed bytes.
+
+    One thread records; others may read ``first``, ``last`` and len() at any
+    time, since the segment list is replaced rather than shrunk in place.
+    Lookups bisect a list of segment starts kept alongside the segments, so
+    they cost the same however many segments are retained.
+    """
+
+    def __init__(self, budget=64 * 2 ** 20, keyframe_interval=32):
+        self.budget = budget
+        self.keyframe_interval = keyframe_interval
+        self.nbytes = 0
+        self._segments = []
+        self._starts = []
+        self._length = 0
+        self._last = None
+        # (generation, board) of the last get(), so replaying forward costs
+        # one XOR per generation
+        self._cursor = None
+
+    def __len__(self):
+        return self._length
+
+    def __contains__(self, generation):
+        return self._segment(generation) is not None
+
+    @property
+    def first(self):
+        segments = self._segments
+        return segments[0].start if segments else None
+
+    @property
+    def last(self):
+        segments = self._segments
+        return segments[-1].stop - 1 if segments else None
+
+    def clear(self):
+        self._segments = []
+        self._starts = []
+        self._length = 0
+        self.nbytes = 0
+        self._last = self._cursor = None
+
+    def record(self, generation, board):
+        """Store ``board`` as ``generation``, dropping any later generations.
+
+        A board that doesn't directly follow the last one (after an edit,
+        a rewind or a jump) starts a new keyframe.
+        """
+        board = np.ascontiguousarray(board, dtype=np.uint8)
+        if self._segments and generation <= self.last:
+            self._truncate(generation)
+        segment = self._segments[-1] if self._segments else None
+        if (segment is None or generation != segment.stop
+                or board.shape != segment.shape
+                or segment.stop - segment.start >= self.keyframe_interval):
+            segment = _Segment(generation, board)
+            self._starts.append(generation)
+            self._segments.append(segment)
+            self.nbytes += segment.nbytes
+        else:
+            delta = zlib.compress(np.bitwise_xor(board, self._last).tobytes(), 1)
+            segment.deltas.append(delta)
+            segment.nbytes += len(delta)
+            self.nbytes += len(delta)
+        self._length += 1
+        self._last = board.copy()
+        # The newest segment always stays, even if it alone is over budget.
+        dropped = 0
+        while self.nbytes > self.budget and dropped < len(self._segments) - 1:
+            segment = self._segments[dropped]
+            self.nbytes -= segment.nbytes
+            self._length -= segment.stop - segment.start
+            dropped += 1
+        if dropped:
+            self._starts = self._starts[dropped:]
+            self._segments = self._segments[dropped:]
+
+    def get(self, generation):
+        """The board of a retained generation (a new array)."""
+        segment = self._segment(generation)
+        if segment is None:
+            raise KeyError(generation)
+        if (self._cursor is not None
+                and segment.start <= self._cursor[0] <= generation):
+            done, board = self._cursor
+            board = board.copy()
+        else:
+            done = segment.start
+            board = np.frombuffer(zlib.decompress(segment.keyframe), dtype=np.uint8)
+            board = board.reshape(segment.shape).copy()
+        for delta in segment.deltas[done - segment.start:generation - segment.start]:
+            board ^= np.frombuffer(zlib.decompress(delta), dtype=np.uint8).reshape(segment.shape)
+        self._cursor = (generation, board.copy())
+        return board
+
+    def _segment(self, generation):
+        """The segment holding ``generation``, or None."""
+        index = bisect.bisect_right(self._starts, generation) - 1
+        if index >= 0 and generation < self._segments[index].stop:
+            return self._segments[index]
+        return None
+
+    def _truncate(self, generation):
+        """Drop ``generation`` and everything after it."""
+        count = bisect.bisect_left(self._starts, generation)
+        for segment in self._segments[count:]:
+            self.nbytes -= segment.nbytes
+            self._length -= segment.stop - segment.start
+        self._starts = self._starts[:count]
+        self._segments = self._segments[:count]
+        if self._segments and generation <= self.last:
+            segment = self._segments[-1]
+            kept = generation - segment.start - 1
+            dropped = segment.deltas[kept:]
+            segment.deltas = segment.deltas[:kept]
+            self._length -= len(dropped)
+            size = sum(len(delta) for delta in dropped)
+            segment.nbytes -= size
+            self.nbytes -= size
+        self._cursor = None
+        self._last = self.get(generation - 1) if generation - 1 in self else None
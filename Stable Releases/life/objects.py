@@ -0,0 +1,202 @@
+"""Count and name the objects on a board, updating only where it changed.
+
+An object is an 8-connected group of live cells (any type; edges wrap like
+the board).  ObjectCensus keeps a label per cell and, each update, relabels
+only the objects touched by changed cells, so a settled soup costs little
+more than the comparison with the previous board.
+
+Objects made only of NORMAL cells are named by their shape: the cells are
+normalized over the 8 rotations and reflections and looked up among the
+phases of PATTERNS.  Shapes are memoized in PatternTable with LRU eviction,
+so the normalization runs once per new shape.  Objects of other types are
+counted as clusters of their type.  Patterns that fall apart into several
+objects in some phase (the beacon) are only named in their connected phases.
+"""
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+from life import vectorized
+
+# Name of a cluster of one non-NORMAL cell type.
+TYPE_NAMES = {
+    vectorized.IMMORTAL: "immortal",
+    vectorized.EPHEMERAL: "ephemeral",
+    vectorized.VIRAL: "viral",
+    vectorized.SHRINKER: "shrinker",
+    vectorized.SPREADER: "spreader",
+    vectorized.BLINKER: "blinker cells",
+}
+
+# name, one phase ("O" is a live cell), period
+PATTERNS = (
+    ("block", ("OO", "OO"), 1),
+    ("beehive", (".OO.", "O..O", ".OO."), 1),
+    ("loaf", (".OO.", "O..O", ".O.O", "..O."), 1),
+    ("boat", ("OO.", "O.O", ".O."), 1),
+    ("ship", ("OO.", "O.O", ".OO"), 1),
+    ("tub", (".O.", "O.O", ".O."), 1),
+    ("pond", (".OO.", "O..O", "O..O", ".OO."), 1),
+    ("blinker", ("OOO",), 2),
+    ("toad", (".OOO", "OOO."), 2),
+    ("beacon", ("OO..", "OO..", "..OO", "..OO"), 2),
+    ("glider", (".O.", "..O", "OOO"), 4),
+    ("lwss", (".O..O", "O....", "O...O", "OOOO."), 4),
+)
+
+
+def canonical(cells):
+    """The smallest of the 8 rotations/reflections of ``(y, x, type)`` cells,
+    translated to the origin."""
+    best = None
+    for swap in (False, True):
+        for sy in (1, -1):
+            for sx in (1, -1):
+                moved = [((x if swap else y) * sy, (y if swap else x) * sx, cell)
+                         for y, x, cell in cells]
+                top = min(y for y, _, _ in moved)
+                left = min(x for _, x, _ in moved)
+                shape = tuple(sorted((y - top, x - left, cell) for y, x, cell in moved))
+                if best is None or shape < best:
+                    best = shape
+    return best
+
+
+def _label(flat, width, height, pending):
+    """Split the live cells ``pending`` (a set of flat indices, emptied) into
+    objects; yields ``(indices, offsets)`` with unwrapped (dy, dx) offsets."""
+    while pending:
+        start = pending.pop()
+        offsets = {start: (0, 0)}
+        stack = [start]
+        while stack:
+            index = stack.pop()
+            y, x = divmod(index, width)
+            oy, ox = offsets[index]
+            for dy, dx in vectorized.OFFSETS:
+                neighbor = (y + dy) % height * width + (x + dx) % width
+                if neighbor in pending:
+                    pending.remove(neighbor)
+                    offsets[neighbor] = (oy + dy, ox + dx)
+                    stack.append(neighbor)
+        yield list(offsets), list(offsets.values())
+
+
+def known_shapes():
+    """``{canonical shape: name}`` of every connected phase of PATTERNS."""
+    shapes = {}
+    for name, rows, period in PATTERNS:
+        board = np.zeros((len(rows) + 16, max(map(len, rows)) + 16), dtype=np.uint8)
+        for y, row in enumerate(rows):
+            for x, cell in enumerate(row):
+                board[y + 8, x + 8] = cell == "O"
+        for _ in range(period):
+            flat = board.ravel()
+            found = list(_label(flat, board.shape[1], board.shape[0],
+                                set(np.flatnonzero(flat).tolist())))
+            if len(found) == 1:
+                offsets = found[0][1]
+                shapes[canonical([(y, x, 1) for y, x in offsets])] = name
+            board = vectorized.step_classic(board)
+    return shapes
+
+
+class PatternTable:
+    """Names objects by shape, remembering the last ``maxsize`` shapes."""
+
+    def __init__(self, maxsize=4096, known=None):
+        self.maxsize = maxsize
+        self.known = known_shapes() if known is None else known
+        self.hits = self.misses = 0
+        self._names = OrderedDict()
+
+    def name(self, cells):
+        """Name of an object given as ``(y, x, type)`` cells."""
+        top = min(y for y, _, _ in cells)
+        left = min(x for _, x, _ in cells)
+        key = tuple(sorted((y - top, x - left, cell) for y, x, cell in cells))
+        name = self._names.get(key)
+        if name is not None:
+            self.hits += 1
+            self._names.move_to_end(key)
+            return name
+        self.misses += 1
+        types = {cell for _, _, cell in cells}
+        if types == {vectorized.NORMAL}:
+            name = self.known.get(canonical(cells), "other")
+        elif len(types) == 1:
+            name = TYPE_NAMES.get(types.pop(), "other") + " cluster"
+        else:
+            name = "mixed cluster"
+        self._names[key] = name
+        if len(self._names) > self.maxsize:
+            self._names.popitem(last=False)
+        return name
+
+
+class ObjectCensus:
+    """Objects of successive boards; update() with each board to count them.
+
+    Boards need not be consecutive generations: only the cells that differ
+    from the previous update() are looked at.
+    """
+
+    def __init__(self, table=None):
+        self.table = table if table is not None else PatternTable()
+        self.reset()
+
+    def reset(self):
+        self.counts = Counter()
+        self._board = None
+        self._labels = None
+        self._objects = {}  # label: (flat indices, name)
+        self._next_label = 1
+
+    def __len__(self):
+        return len(self._objects)
+
+    def update(self, board):
+        """Count the objects of ``board``; returns ``{name: count}``."""
+        board = np.array(board, dtype=np.uint8)
+        height, width = board.shape
+        flat = board.ravel()
+        if self._board is None or self._board.shape != board.shape:
+            self.reset()
+            self._labels = np.zeros(flat.size, dtype=np.int64)
+            pending = set(np.flatnonzero(flat).tolist())
+        else:
+            changed = np.flatnonzero(flat != self._board.ravel())
+            if not len(changed):
+                return self.counts
+            # objects on or next to a changed cell may have grown, shrunk,
+            # split or merged; everything else is left alone
+            rows, cols = np.divmod(changed, width)
+            near = np.concatenate([(rows + dy) % height * width + (cols + dx) % width
+                                   for dy in (-1, 0, 1) for dx in (-1, 0, 1)])
+            pending = set(changed[flat[changed] != 0].tolist())
+            for label in np.unique(self._labels[near]).tolist():
+                if label:
+                    indices, name = self._objects.pop(label)
+                    self._remove(name)
+                    self._labels[indices] = 0
+                    pending.update(index for index in indices if flat[index])
+        for indices, offsets in _label(flat, width, height, pending):
+            types = flat[indices].tolist()
+            name = self.table.name([(y, x, cell) for (y, x), cell in zip(offsets, types)])
+            label = self._next_label
+            self._next_label += 1
+            self._labels[indices] = label
+            self._objects[label] = (indices, name)
+            self.counts[name] += 1
+        self._board = board
+        return self.counts
+
+    def _remove(self, name):
+        self.counts[name] -= 1
+        if not self.counts[name]:
+            del self.counts[name]
+
+
+def summary(counts, limit=None):
+    """``"12 block, 3 blinker, ..."``, most common first."""
+    return ", ".join(f"{count} {name}" for name, count in counts.most_common(limit))
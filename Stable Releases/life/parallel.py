@@ -0,0 +1,128 @@
+"""Multi-core stepping over shared memory.
+
+The board lives in two shared-memory buffers that are used in turn (one is
+read, the other written).  Each worker process owns a strip of full-width
+rows.  Every generation it reads its rows plus a halo of wrapped rows above
+and below straight from the read buffer, which is the halo exchange, and
+writes its rows of the next generation into the other buffer.  Columns wrap
+inside the strip because it spans the whole width.
+
+The halo is 1 row for the 1.py rules and 2 for the 4.py rules.  In 4.py a
+cell can be changed by a SHRINKER, SPREADER or VIRAL neighbor whose own
+neighbors decide what it does, so a target depends on cells two rows away
+even across strip boundaries.  The 4.py rules step a typed state (cell
+types and ages, see vectorized.typed_state()), so both buffers hold two
+planes.  The results are the same as life.vectorized for the same seed.
+"""
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from life import vectorized
+
+_HALO = {"classic": 1, "typed": 2}
+
+# Per-process state set up by _attach() in every worker.
+_worker = {}
+
+
+def _attach(names, shape, rules):
+    buffers = [shared_memory.SharedMemory(name=name) for name in names]
+    _worker["buffers"] = buffers
+    _worker["boards"] = [np.ndarray(shape, dtype=np.uint8, buffer=shm.buf) for shm in buffers]
+    _worker["rules"] = rules
+
+
+def _step_strip(task):
+    """Step rows [top, bottom) from one buffer into the other."""
+    source, top, bottom, key = task
+    boards, rules = _worker["boards"], _worker["rules"]
+    step_rows(boards[source], boards[1 - source], top, bottom, rules, key)
+
+
+def step_rows(board, out, top, bottom, rules, key=None):
+    """Write rows [top, bottom) of the next generation of ``board`` into ``out``."""
+    height, width = board.shape[-2:]
+    halo = _HALO[rules]
+    rows = np.arange(top - halo, bottom + halo) % height
+    block = board[..., rows, :]
+    if rules == "classic":
+        result = vectorized.step_classic(block)
+    else:
+        ids = vectorized.cell_ids(rows, np.arange(width), width)
+        result = vectorized.step_typed_state_region(block, key, ids)
+    out[..., top:bottom, :] = result[..., halo:-halo, :]
+
+
+class ParallelStepper:
+    """Steps a board with the "classic" or "typed" rules on a process pool.
+
+    Use it as a context manager, or call close(), to stop the workers and
+    free the shared memory.  ``board`` is a view of the current generation
+    (a typed state with the typed rules; a plain board passed in starts
+    with all ages 0); copy it if you keep it across step() calls.
+    """
+
+    def __init__(self, board, rules="classic", rng=None, processes=None, strips=None):
+        if rules not in _HALO:
+            raise ValueError(f"unknown rules {rules!r}")
+        if rules == "typed" and rng is None:
+            raise ValueError("the typed rules need an rng")
+        board = vectorized.to_array(board)
+        if rules == "typed" and board.ndim == 2:
+            board = vectorized.typed_state(board)
+        self.rules = rules
+        self.rng = rng
+        self.generation = 0
+        self.processes = processes or os.cpu_count() or 1
+        height = board.shape[-2]
+        # More strips than processes evens out uneven strips.
+        count = max(1, min(strips or self.processes * 2, height // _HALO[rules]))
+        edges = np.linspace(0, height, count + 1).astype(int).tolist()
+        self._strips = list(zip(edges[:-1], edges[1:]))
+
+        self._buffers = [shared_memory.SharedMemory(create=True, size=max(board.nbytes, 1))
+                         for _ in range(2)]
+        self._boards = [np.ndarray(board.shape, dtype=np.uint8, buffer=shm.buf)
+                        for shm in self._buffers]
+        self._boards[0][:] = board
+        self._current = 0
+        self._pool = multiprocessing.Pool(
+            self.processes, _attach,
+            ([shm.name for shm in self._buffers], board.shape, rules))
+
+    @property
+    def board(self):
+        return self._boards[self._current]
+
+    def set_board(self, board):
+        """Overwrite the current generation (same shape; ages 0 for a plain board)."""
+        board = vectorized.to_array(board)
+        if self.rules == "typed" and board.ndim == 2:
+            board = vectorized.typed_state(board)
+        self._boards[self._current][:] = board
+
+    def step(self):
+        """Advance one generation on all workers and return the new board."""
+        key = vectorized.generation_key(self.rng) if self.rules == "typed" else None
+        tasks = [(self._current, top, bottom, key) for top, bottom in self._strips]
+        self._pool.map(_step_strip, tasks)
+        self._current = 1 - self._current
+        self.generation += 1
+        return self.board
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+        self._boards = None
+        for shm in self._buffers:
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,202 @@
+"""Per-frame timings for the main loops.
+
+Call ``profiler.lap(name)`` at the end of each phase of a frame (or wrap
+it in ``with profiler.phase(name):``, or a function run on another thread
+in profiler.timed()), then end_frame() once per frame.  The profiler keeps
+the last ``history`` durations of every phase for rolling percentiles, the
+generation rate and a census of cell types.  It can also stream every
+frame to a CSV file or a Chrome trace (``chrome://tracing`` or
+https://ui.perfetto.dev) for offline profiling.  Pure Python; NumPy boards
+are counted with ``bincount``.
+"""
+import csv
+import json
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+
+def census(board):
+    """``{cell type: count}`` of the non-empty cells of a grid or array."""
+    if hasattr(board, "ravel"):
+        import numpy as np
+        counts = np.bincount(board.ravel())
+        return {cell: int(count) for cell, count in enumerate(counts) if cell and count}
+    counts = Counter()
+    for row in board:
+        counts.update(row)
+    counts.pop(0, None)
+    return dict(counts)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    index = min(int(fraction * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class CsvTrace:
+    """One row per frame: time, generation, population, milliseconds per phase
+    and the census as ``type:count`` pairs."""
+
+    def __init__(self, path, phases):
+        self.phases = list(phases)
+        self._file = open(path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(["frame", "time_s", "generation", "population"]
+                              + [f"{phase}_ms" for phase in self.phases] + ["census"])
+
+    def write(self, frame, now, generation, spans, counts):
+        totals = dict.fromkeys(self.phases, 0.0)
+        for name, start, end, _ in spans:
+            if name in totals:
+                totals[name] += (end - start) * 1000
+        population = sum(counts.values()) if counts is not None else ""
+        cells = " ".join(f"{cell}:{count}" for cell, count in sorted(counts.items())) \
+            if counts is not None else ""
+        self._writer.writerow([frame, f"{now:.6f}", generation, population]
+                              + [f"{totals[phase]:.3f}" for phase in self.phases] + [cells])
+
+    def close(self):
+        self._file.close()
+
+
+class ChromeTrace:
+    """Trace Event Format: a span per phase on the thread that ran it, and
+    counters for the generation, population and census.  The closing bracket
+    is optional in that format, so a trace cut short still loads."""
+
+    def __init__(self, path):
+        self._file = open(path, "w")
+        self._file.write("[\n")
+        self._first = True
+
+    def _event(self, event):
+        if not self._first:
+            self._file.write(",\n")
+        self._first = False
+        self._file.write(json.dumps(event, separators=(",", ":")))
+
+    def write(self, frame, now, generation, spans, counts):
+        for name, start, end, thread in spans:
+            self._event({"name": name, "ph": "X", "pid": 1, "tid": thread,
+                         "ts": round(start * 1e6), "dur": round((end - start) * 1e6),
+                         "args": {"frame": frame}})
+        args = {"generation": generation}
+        if counts is not None:
+            args["population"] = sum(counts.values())
+        self._event({"name": "board", "ph": "C", "pid": 1, "ts": round(now * 1e6),
+                     "args": args})
+        if counts:
+            self._event({"name": "census", "ph": "C", "pid": 1, "ts": round(now * 1e6),
+                         "args": {f"type {cell}": count for cell, count in sorted(counts.items())}})
+
+    def close(self):
+        self._file.write("\n]\n")
+        self._file.close()
+
+
+class FrameProfiler:
+    """Rolling per-phase timings, generation rate and census of a main loop.
+
+    ``trace`` is a path ending in ``.csv`` or ``.json`` (Chrome trace), or
+    None.  ``phases`` are the CSV columns; a Chrome trace takes any name.
+    """
+
+    def __init__(self, history=300, trace=None, phases=("events", "update", "draw", "present")):
+        self.history = history
+        self.samples = {}
+        self.counts = None
+        self.frame = 0
+        self._frames = deque(maxlen=history)
+        self._spans = []
+        self._origin = time.perf_counter()
+        self._last_end = None
+        self._lap_start = None
+        self._trace = None
+        if trace is not None and trace.endswith(".csv"):
+            self._trace = CsvTrace(trace, phases)
+        elif trace is not None:
+            self._trace = ChromeTrace(trace)
+
+    @property
+    def tracing(self):
+        return self._trace is not None
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, start, time.perf_counter())
+
+    def lap(self, name):
+        """Record the time since the last lap() or end_frame() as phase ``name``."""
+        now = time.perf_counter()
+        if self._lap_start is not None:
+            self._record(name, self._lap_start, now)
+        self._lap_start = now
+
+    def timed(self, name, function):
+        """Wrap ``function`` so every call is recorded as phase ``name``."""
+        def timed_function(*args, **kwargs):
+            with self.phase(name):
+                return function(*args, **kwargs)
+        return timed_function
+
+    def _record(self, name, start, end):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples.setdefault(name, deque(maxlen=self.history))
+        samples.append(end - start)
+        if self._trace is not None:
+            # list.append is atomic, so other threads may record too
+            self._spans.append((name, start - self._origin, end - self._origin,
+                                threading.current_thread().name))
+
+    def end_frame(self, generation, board=None):
+        """Close the frame; pass the board to take a census (costs a pass over it)."""
+        now = time.perf_counter()
+        if self._last_end is not None:
+            self._record("frame", self._last_end, now)
+        self._last_end = self._lap_start = now
+        self._frames.append((now, generation))
+        self.counts = census(board) if board is not None else None
+        if self._trace is not None:
+            spans, self._spans = self._spans, []
+            self._trace.write(self.frame, now - self._origin, generation, spans, self.counts)
+        self.frame += 1
+
+    def percentiles(self, name):
+        """``(p50, p95, p99)`` in seconds of a phase, or None if never recorded."""
+        samples = self.samples.get(name)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return tuple(percentile(ordered, fraction) for fraction in (0.50, 0.95, 0.99))
+
+    @property
+    def generations_per_second(self):
+        if len(self._frames) < 2:
+            return 0.0
+        (start, first), (end, last) = self._frames[0], self._frames[-1]
+        return (last - first) / (end - start) if end > start else 0.0
+
+    def lines(self):
+        """Text lines for an on-screen overlay."""
+        lines = ["phase      p50    p95    p99 ms"]
+        for name in sorted(self.samples):
+            p50, p95, p99 = (value * 1000 for value in self.percentiles(name))
+            lines.append(f"{name:<8}{p50:7.2f}{p95:7.2f}{p99:7.2f}")
+        lines.append(f"{self.generations_per_second:.1f} gens/s")
+        if self.counts is not None:
+            lines.append(f"population {sum(self.counts.values())}")
+            lines.append(" ".join(f"{cell}:{count}" for cell, count in sorted(self.counts.items())))
+        return lines
+
+    def close(self):
+        if self._trace is not None:
+            self._trace.close()
+            self._trace = None
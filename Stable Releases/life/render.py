@@ -0,0 +1,430 @@
+"""Palette-indexed rendering of cell-type grids.
+
+On a 32-bit surface GridRenderer writes the cells straight into its
+pixels: the grid is mapped through the release's ``TYPE_COLORS`` and each
+cell's color is broadcast over its ``CELL_SIZE`` square, grid lines
+included.  On other surfaces the grid is copied into an 8-bit palette
+surface, scaled up in one call and covered with a cached grid-line overlay.
+pygame is only imported when the first frame is drawn.
+
+GridRenderer.draw_changes() repaints only the cells that differ from the
+last frame and returns rectangles covering them for
+``pygame.display.update()``.
+The release main loops go through draw_changes() and present() here, which
+fall back to the release's draw_grid() and a full flip without NumPy; the
+rest of the module needs it.
+
+ViewRenderer draws what a life.camera.Camera sees.  Zoomed out below one
+pixel per cell it shows a density image instead, one pixel per square of
+cells, kept in a DensityMap that only recounts the squares of the cells
+it is told have changed.
+"""
+try:
+    import numpy as np
+except ImportError:  # only draw_changes() and present() work without it
+    np = None
+
+# Color key of the grid-line overlay; any color no release draws with.
+_TRANSPARENT = (255, 0, 255)
+# Cell value that never occurs in a grid; marks cells to repaint.
+_STALE = 255
+# Above this fraction of changed cells a full redraw and flip is cheaper.
+FULL_REDRAW_FRACTION = 0.3
+# Above this fraction of changed squares DensityMap counts the whole board.
+RECOUNT_FRACTION = 0.1
+# Smallest zoom (pixels per cell) at which ViewRenderer draws grid lines.
+GRID_LINE_ZOOM = 4
+
+
+def palette(colors, background, default=None):
+    """256-entry palette: index 0 is the background, others their type color.
+
+    Types missing from ``colors`` get ``default`` (the NORMAL color, like
+    ``TYPE_COLORS.get(cell, TYPE_COLORS[CELL_NORMAL])`` in draw_grid()).
+    """
+    if default is None:
+        default = colors.get(1, (255, 255, 255))
+    entries = [background] + [default] * 255
+    for cell_type, color in colors.items():
+        entries[cell_type] = color
+    return entries
+
+
+def gradient(start, end):
+    """256-entry palette fading from ``start`` (index 0) to ``end`` (255)."""
+    return [tuple(a + (b - a) * i // 255 for a, b in zip(start, end)) for i in range(256)]
+
+
+def _grid_lines(size, cell_size, color):
+    """Colorkeyed overlay with a line at every cell_size pixels."""
+    import pygame
+    lines = pygame.Surface(size)
+    lines.fill(_TRANSPARENT)
+    for x in range(0, size[0], cell_size):
+        pygame.draw.line(lines, color, (x, 0), (x, size[1]))
+    for y in range(0, size[1], cell_size):
+        pygame.draw.line(lines, color, (0, y), (size[0], y))
+    if pygame.display.get_surface() is not None:
+        lines = lines.convert()
+    lines.set_colorkey(_TRANSPARENT)
+    return lines
+
+
+class GridRenderer:
+    """Draws a grid of cell types the way draw_grid() does, pixel for pixel."""
+
+    def __init__(self, cell_size, colors, background, grid_color, default=None):
+        self.cell_size = cell_size
+        self.palette = palette(colors, background, default)
+        self.grid_color = grid_color
+        self.shape = None
+        self._previous = None
+        self._dest = (0, 0)
+
+    def resize(self, cell_size):
+        """Draw cells ``cell_size`` pixels wide from the next frame on."""
+        self.cell_size = cell_size
+        self.shape = None
+
+    def _build(self, shape):
+        import pygame
+        height, width = shape
+        self._cells = pygame.Surface((width, height), depth=8)
+        self._cells.set_palette(self.palette)
+        self._scaled = self._lines = None
+        self.shape = shape
+        self._previous = None
+        self._colors = None  # (pixel format, palette and grid color mapped to it)
+
+    def _overlays(self):
+        """The scaled-cells surface and grid-line overlay of the blit path."""
+        import pygame
+        if self._scaled is None:
+            height, width = self.shape
+            size = (width * self.cell_size, height * self.cell_size)
+            self._scaled = pygame.Surface(size, depth=8)
+            self._scaled.set_palette(self.palette)
+            self._lines = _grid_lines(size, self.cell_size, self.grid_color)
+        return self._scaled, self._lines
+
+    def _pixels(self, surface, dest):
+        """The grid's area of a 32-bit surface as a (rows, cell_size, columns,
+        cell_size) array of its pixels, or None to draw with blits instead.
+
+        The surface stays locked until the array is deleted.
+        """
+        import pygame
+        height, width = self.shape
+        size = self.cell_size
+        x, y = dest
+        if (surface.get_bitsize() != 32 or surface.get_flags() & pygame.SRCALPHA
+                or x < 0 or y < 0 or x + width * size > surface.get_width()
+                or y + height * size > surface.get_height()):
+            return None
+        masks = surface.get_masks()
+        if self._colors is None or self._colors[0] != masks:
+            colors = [surface.map_rgb(color) for color in self.palette + [self.grid_color]]
+            self._colors = (masks, np.array(colors, dtype=np.uint32))
+        pixels = pygame.surfarray.pixels2d(surface).T
+        return pixels[y:y + height * size, x:x + width * size].reshape(height, size, width, size)
+
+    def _paint(self, pixels, board):
+        """Write the cells of ``board`` into their pixels from _pixels()."""
+        colors, size = self._colors[1], self.cell_size
+        # one row of pixels per row of cells, copied down the cells;
+        # grid lines are the top row and left column of every cell
+        row = np.repeat(colors[board], size, axis=1)
+        row[:, ::size] = colors[-1]
+        pixels = pixels.reshape(board.shape[0], size, -1)
+        pixels[:, 1:] = row[:, None, :]
+        pixels[:, 0] = colors[-1]
+
+    def draw(self, surface, grid, dest=(0, 0)):
+        """Draw ``grid`` (list-of-lists or array, indexed [y, x]) onto surface."""
+        import pygame
+        board = np.asarray(grid, dtype=np.uint8)
+        if board.shape != self.shape:
+            self._build(board.shape)
+        pixels = self._pixels(surface, dest)
+        if pixels is not None:
+            self._paint(pixels, board)
+            del pixels
+        else:
+            scaled, lines = self._overlays()
+            pygame.surfarray.blit_array(self._cells, board.T)
+            pygame.transform.scale(self._cells, scaled.get_size(), scaled)
+            surface.blit(scaled, dest)
+            surface.blit(lines, dest)
+        self._previous = board.copy()
+        self._dest = dest
+
+    def draw_changes(self, surface, grid, dest=(0, 0)):
+        """Repaint the cells that changed since the last frame.
+
+        Returns a list of screen rectangles covering the repainted cells, or
+        None if the whole grid was redrawn (first frame, more than
+        ``FULL_REDRAW_FRACTION`` of the cells changed, or a new position).
+        """
+        import pygame
+        board = np.asarray(grid, dtype=np.uint8)
+        if board.shape != self.shape or self._previous is None or dest != self._dest:
+            self.draw(surface, board, dest)
+            return None
+        changed = board != self._previous
+        if changed.mean() > FULL_REDRAW_FRACTION:
+            self.draw(surface, board, dest)
+            return None
+
+        size = self.cell_size
+        pixels = self._pixels(surface, dest)
+        if pixels is not None:
+            rects = []
+            for x, y, width, height in bands(changed):
+                self._paint(pixels[y:y + height, :, x:x + width],
+                            board[y:y + height, x:x + width])
+                rects.append(pygame.Rect(dest[0] + x * size, dest[1] + y * size,
+                                         width * size, height * size))
+            del pixels
+            self._previous = board.copy()
+            return rects
+
+        _, lines = self._overlays()
+        pygame.surfarray.blit_array(self._cells, board.T)
+        rects = []
+        for x, y, width, height in cover(changed):
+            scaled = pygame.transform.scale(self._cells.subsurface((x, y, width, height)),
+                                            (width * size, height * size))
+            rect = pygame.Rect(dest[0] + x * size, dest[1] + y * size,
+                               width * size, height * size)
+            surface.blit(scaled, rect)
+            surface.blit(lines, rect, rect.move(-dest[0], -dest[1]))
+            rects.append(rect)
+        self._previous = board.copy()
+        return rects
+
+    def reset(self):
+        """Forget the last frame; the next draw_changes() redraws everything."""
+        self._previous = None
+
+    def invalidate(self, rect):
+        """Repaint the cells under a screen rectangle on the next draw_changes()."""
+        if self._previous is None:
+            return
+        size = self.cell_size
+        left, top = rect[0] - self._dest[0], rect[1] - self._dest[1]
+        x0, y0 = max(left // size, 0), max(top // size, 0)
+        x1 = -(-(left + rect[2]) // size)
+        y1 = -(-(top + rect[3]) // size)
+        self._previous[y0:y1, x0:x1] = _STALE
+
+    def present(self, rects, *overlays):
+        """Show a frame from draw_changes(), plus rectangles drawn on top of it.
+
+        The overlays are pushed along with the cells and repainted from the
+        grid on the next frame, so text over the grid does not smear.
+        """
+        import pygame
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects + list(overlays))
+        for rect in overlays:
+            self.invalidate(rect)
+
+
+def draw_changes(renderer, surface, grid, draw_grid, full=False):
+    """Repaint the cells of ``grid`` that changed since the last frame.
+
+    Returns their rectangles for present(), or None after a full redraw
+    with ``draw_grid(surface, grid)``: without a renderer (``renderer`` is
+    None when NumPy is missing), and whenever ``full`` is set.
+    """
+    if renderer is None or full:
+        draw_grid(surface, grid)
+        if renderer is not None:
+            renderer.reset()
+        return None
+    return renderer.draw_changes(surface, grid)
+
+
+def present(renderer, rects, *overlays):
+    """Push a frame from draw_changes() and the overlays drawn on it to the display."""
+    if renderer is not None:
+        renderer.present(rects, *overlays)
+    else:
+        import pygame
+        pygame.display.flip()
+
+
+class DensityMap:
+    """Fraction of live cells in each ``factor`` x ``factor`` square, 0-255.
+
+    update() is told which cells changed since the previous call (the flat
+    indices ``y * width + x`` a diff or the stepper already has, or a list
+    of arrays of them) and recounts only their squares; without them, or after the factor or
+    board shape changed, it counts the whole board once.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Forget the counts; the next update() counts the whole board."""
+        self.factor = None
+        self.density = None
+        self._shape = None
+
+    def update(self, board, factor, changed=None):
+        height, width = board.shape
+        if factor != self.factor or board.shape != self._shape or changed is None:
+            self.factor = factor
+            self._shape = board.shape
+            self.density = _density(board, factor)
+            return self.density
+        if isinstance(changed, list):
+            changed = np.concatenate(changed) if changed else ()
+        changed = np.asarray(changed, dtype=np.intp).ravel()
+        if not changed.size:
+            return self.density
+        rows, cols = np.divmod(changed, width)
+        touched = np.zeros(self.density.size, dtype=bool)
+        touched[rows // factor * self.density.shape[1] + cols // factor] = True
+        squares = np.flatnonzero(touched)
+        # gathering square by square costs several times a contiguous count
+        if squares.size > self.density.size * RECOUNT_FRACTION:
+            self.density = _density(board, factor)
+            return self.density
+        # gather the cells of every changed square; cells past the edge count as empty
+        sy, sx = np.divmod(squares, self.density.shape[1])
+        offsets = np.arange(factor)
+        ys = (sy * factor)[:, None, None] + offsets[None, :, None]
+        xs = (sx * factor)[:, None, None] + offsets[None, None, :]
+        inside = (ys < height) & (xs < width)
+        alive = (board[np.minimum(ys, height - 1), np.minimum(xs, width - 1)] != 0) & inside
+        counts = alive.sum(axis=(1, 2), dtype=np.uint32)
+        self.density.ravel()[squares] = counts * 255 // (factor * factor)
+        return self.density
+
+
+def _density(board, factor):
+    return (_blocks(board != 0, factor, np.sum) * 255 // (factor * factor)).astype(np.uint8)
+
+
+def _blocks(mask, factor, reduce):
+    """Reduce each factor x factor square of a mask; edges are padded with False."""
+    height, width = mask.shape
+    rows, cols = -(-height // factor), -(-width // factor)
+    if (rows * factor, cols * factor) != mask.shape:
+        mask = np.pad(mask, ((0, rows * factor - height), (0, cols * factor - width)))
+    return reduce(mask.reshape(rows, factor, cols, factor), axis=(1, 3), dtype=np.uint32)
+
+
+class ViewRenderer:
+    """Draws the part of a grid that a life.camera.Camera sees.
+
+    Cells are drawn with the type palette down to one pixel per cell, with
+    grid lines from ``GRID_LINE_ZOOM`` up.  Further out, each pixel shows
+    the density of live cells in its square, from ``background`` to
+    ``default`` (the NORMAL color).  draw() takes the flat indices of the
+    cells changed since the last draw() (as DensityMap.update() does), or
+    None if they are not known.
+    """
+
+    def __init__(self, colors, background, grid_color, default=None):
+        self.palette = palette(colors, background, default)
+        self.density_palette = gradient(background, self.palette[255])
+        self.grid_color = grid_color
+        self.density = DensityMap()
+        self._surfaces = {}
+        self._lines = {}
+
+    def draw(self, surface, grid, camera, changed=None):
+        import pygame
+        board = np.asarray(grid, dtype=np.uint8)
+        height, width = board.shape
+        x, y, columns, rows = camera.visible()
+        if camera.zoom >= 1:
+            zoom = int(camera.zoom)
+            region = board[np.ix_(np.arange(y, y + rows) % height,
+                                  np.arange(x, x + columns) % width)]
+            cells = self._surface((columns, rows), self.palette)
+            pygame.surfarray.blit_array(cells, region.T)
+            self.density.reset()  # misses these boards' changes
+            size = (columns * zoom, rows * zoom)
+            scaled = self._surface(size, self.palette)
+            pygame.transform.scale(cells, size, scaled)
+            dest = camera.to_screen(x, y)
+            surface.blit(scaled, dest)
+            if zoom >= GRID_LINE_ZOOM:
+                if size not in self._lines:
+                    self._lines = {size: _grid_lines(size, zoom, self.grid_color)}
+                surface.blit(self._lines[size], dest)
+        else:
+            factor = round(1 / camera.zoom)
+            density = self.density.update(board, factor, changed)
+            x, y = x // factor, y // factor
+            columns, rows = -(-columns // factor) + 1, -(-rows // factor) + 1
+            region = density[np.ix_(np.arange(y, y + rows) % density.shape[0],
+                                    np.arange(x, x + columns) % density.shape[1])]
+            pixels = self._surface((columns, rows), self.density_palette)
+            pygame.surfarray.blit_array(pixels, region.T)
+            surface.blit(pixels, camera.to_screen(x * factor, y * factor))
+
+    def reset(self):
+        """Forget the last board, e.g. after it was drawn some other way."""
+        self.density.reset()
+
+    def _surface(self, size, colors):
+        """An 8-bit surface of that size and palette, reused between frames."""
+        import pygame
+        key = (size, id(colors))
+        if key not in self._surfaces:
+            if len(self._surfaces) > 8:
+                self._surfaces.clear()
+            self._surfaces[key] = pygame.Surface(size, depth=8)
+            self._surfaces[key].set_palette(colors)
+        return self._surfaces[key]
+
+
+def bands(mask):
+    """Cover the True cells of a 2-D mask with (x, y, width, height) rectangles.
+
+    One rectangle per run of rows holding any, from their first to their
+    last True column: far fewer than cover() gives for scattered cells.
+    """
+    rows = mask.any(axis=1).view(np.int8)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], rows, [0]))))
+    rects = []
+    for y0, y1 in zip(edges[::2].tolist(), edges[1::2].tolist()):
+        columns = np.flatnonzero(mask[y0:y1].any(axis=0))
+        rects.append((int(columns[0]), y0, int(columns[-1] - columns[0]) + 1, y1 - y0))
+    return rects
+
+
+def cover(mask):
+    """Cover the True cells of a 2-D mask with (x, y, width, height) rectangles.
+
+    Each row is split into runs of True cells, and a run directly below one
+    with the same extent grows that rectangle instead of starting a new one.
+    """
+    done = []
+    open_rects = {}
+    last_row = None
+    for y in np.flatnonzero(mask.any(axis=1)).tolist():
+        if last_row is not None and y != last_row + 1:
+            done.extend(open_rects.values())
+            open_rects = {}
+        row = mask[y]
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], row.view(np.int8), [0]))))
+        current = {}
+        for x0, x1 in zip(edges[::2].tolist(), edges[1::2].tolist()):
+            rect = open_rects.pop((x0, x1), None)
+            if rect is None:
+                rect = [x0, y, x1 - x0, 0]
+            rect[3] += 1
+            current[(x0, x1)] = rect
+        done.extend(open_rects.values())
+        open_rects = current
+        last_row = y
+    done.extend(open_rects.values())
+    return [tuple(rect) for rect in done]
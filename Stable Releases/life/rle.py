@@ -0,0 +1,149 @@
+"""Run-length encoded patterns, the format Golly and LifeWiki use.
+
+Two-state patterns (the 1.py rules) use ``b`` for dead and ``o`` for alive
+cells.  Boards with the 4.py cell types use the multi-state variant, where
+``.`` is an empty cell and ``A``, ``B``, ... are types 1, 2, ....  A run is
+written as a count followed by the tag, ``$`` ends a row and ``!`` ends the
+pattern.  Pure Python, so it works without NumPy.
+"""
+import re
+
+CLASSIC_RULE = "B3/S23"
+TYPED_RULE = "Enhanced"
+LINE_LENGTH = 70
+
+_HEADER = re.compile(r"x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)(?:\s*,\s*rule\s*=\s*(\S+))?")
+_TOKEN = re.compile(r"(\d*)([bo.$!]|[p-y]?[A-X])")
+
+
+def _state(tag):
+    if tag in "b.":
+        return 0
+    if tag == "o":
+        return 1
+    # A-X are 1-24, pA-pX 25-48 and so on
+    high = ord(tag[0]) - ord("p") + 1 if len(tag) == 2 else 0
+    return high * 24 + ord(tag[-1]) - ord("A") + 1
+
+
+def _tag(state, multistate):
+    if not multistate:
+        return "o" if state else "b"
+    if not state:
+        return "."
+    high, low = divmod(state - 1, 24)
+    return ("" if not high else chr(ord("p") + high - 1)) + chr(ord("A") + low)
+
+
+def loads(text):
+    """Parse RLE text into ``(grid, rule)``; grid is a list of rows of cell types."""
+    width = height = None
+    rule = None
+    body = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if width is None:
+            header = _HEADER.match(line)
+            if header is None:
+                raise ValueError(f"not an RLE header: {line!r}")
+            width, height = int(header.group(1)), int(header.group(2))
+            rule = header.group(3)
+            continue
+        body.append(line)
+    if width is None:
+        raise ValueError("missing RLE header")
+
+    grid = [[0] * width for _ in range(height)]
+    x = y = 0
+    data = "".join(body)
+    position = 0
+    while position < len(data):
+        token = _TOKEN.match(data, position)
+        if token is None:
+            raise ValueError(f"bad RLE data at {data[position:position + 10]!r}")
+        position = token.end()
+        count = int(token.group(1) or 1)
+        tag = token.group(2)
+        if tag == "!":
+            break
+        if tag == "$":
+            x, y = 0, y + count
+            continue
+        state = _state(tag)
+        if state:
+            if y >= height or x + count > width:
+                raise ValueError("RLE data runs past the pattern size")
+            grid[y][x:x + count] = [state] * count
+        x += count
+    return grid, rule
+
+
+def dumps(grid, rule=None):
+    """Encode a grid (list of rows or 2-D array) as RLE text.
+
+    Grids with only 0 and 1 use the two-state tags and ``CLASSIC_RULE``;
+    anything else the multi-state ones and ``TYPED_RULE``.
+    """
+    rows = [[int(cell) for cell in row] for row in grid]
+    height = len(rows)
+    width = len(rows[0]) if rows else 0
+    multistate = any(cell > 1 for row in rows for cell in row)
+    if rule is None:
+        rule = TYPED_RULE if multistate else CLASSIC_RULE
+
+    runs = []
+    blank_rows = 0
+    for row in rows:
+        # trailing empty cells of a row are left out
+        end = len(row)
+        while end and not row[end - 1]:
+            end -= 1
+        if not end:
+            blank_rows += 1
+            continue
+        if runs or blank_rows:
+            runs.append((blank_rows + (1 if runs else 0), "$"))
+        blank_rows = 0
+        x = 0
+        while x < end:
+            start = x
+            while x < end and row[x] == row[start]:
+                x += 1
+            runs.append((x - start, _tag(row[start], multistate)))
+    runs.append((1, "!"))
+
+    lines = [f"x = {width}, y = {height}, rule = {rule}"]
+    line = ""
+    for count, tag in runs:
+        token = (str(count) if count > 1 else "") + tag
+        if len(line) + len(token) > LINE_LENGTH:
+            lines.append(line)
+            line = ""
+        line += token
+    lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def load(path):
+    """Read an .rle file; returns ``(grid, rule)`` like loads()."""
+    with open(path, encoding="ascii") as f:
+        return loads(f.read())
+
+
+def save(path, grid, rule=None):
+    with open(path, "w", encoding="ascii") as f:
+        f.write(dumps(grid, rule))
+
+
+def place(pattern, width, height):
+    """A width x height grid with ``pattern`` centered in it, wrapping if too big."""
+    grid = [[0] * width for _ in range(height)]
+    top = (height - len(pattern)) // 2
+    left = (width - (len(pattern[0]) if pattern else 0)) // 2
+    for y, row in enumerate(pattern):
+        for x, cell in enumerate(row):
+            if cell:
+                grid[(top + y) % height][(left + x) % width] = cell
+    return grid
@@ -0,0 +1,240 @@
+"""Serve one simulation to any number of viewers over TCP.
+
+Run from the ``Stable Releases`` directory::
+
+    python -m life.server --release 4 --width 200 --height 150 --seed 1
+    python -m life.viewer --release 4
+
+The server owns the board and steps it on its own clock (``--fps``).  Every
+generation it sends each client the cells that changed; a client that
+starts with or falls behind by more than ``--queue`` generations gets the
+whole board (a keyframe) instead of the diffs it missed.  Clients send
+batches of edits, which toggle cells like a click in the release windows
+and are applied before the next step.  Clients get the board as the
+release window shows it: release 4 steps cell types and ages, and its dark
+blinkers are sent as empty cells.
+
+Messages are a 5-byte header (kind, payload length) and a payload:
+
+- ``K`` keyframe: generation, width, height, zlib-compressed cells
+- ``D`` diff: generation, count, ``count`` uint32 cell indices
+  (``y * width + x``), then ``count`` uint8 cell types
+- ``E`` edits (client to server): count, indices, types as in a diff
+"""
+import argparse
+import asyncio
+import struct
+import sys
+import zlib
+
+import numpy as np
+
+from life.headless import RELEASES, make_engine
+
+HEADER = struct.Struct("<cI")
+KEYFRAME_HEADER = struct.Struct("<QHH")
+DIFF_HEADER = struct.Struct("<QI")
+EDITS_HEADER = struct.Struct("<I")
+KEYFRAME, DIFF, EDITS = b"K", b"D", b"E"
+DEFAULT_PORT = 7766
+CELL_EMPTY = 0
+
+
+def message(kind, payload):
+    return HEADER.pack(kind, len(payload)) + payload
+
+
+def encode_keyframe(generation, board):
+    height, width = board.shape
+    return message(KEYFRAME, KEYFRAME_HEADER.pack(generation, width, height)
+                   + zlib.compress(board.tobytes(), 1))
+
+
+def encode_diff(generation, indices, cells):
+    return message(DIFF, DIFF_HEADER.pack(generation, len(indices))
+                   + indices.astype("<u4").tobytes() + cells.astype(np.uint8).tobytes())
+
+
+def encode_edits(indices, cells):
+    indices, cells = np.asarray(indices), np.asarray(cells)
+    return message(EDITS, EDITS_HEADER.pack(len(indices))
+                   + indices.astype("<u4").tobytes() + cells.astype(np.uint8).tobytes())
+
+
+def _cells(payload, offset, count):
+    end = offset + 4 * count
+    indices = np.frombuffer(payload, dtype="<u4", count=count, offset=offset)
+    return indices, np.frombuffer(payload, dtype=np.uint8, count=count, offset=end)
+
+
+def decode(kind, payload):
+    """``(generation, board)`` of a keyframe, ``(generation, indices, cells)``
+    of a diff or ``(indices, cells)`` of edits."""
+    if kind == KEYFRAME:
+        generation, width, height = KEYFRAME_HEADER.unpack_from(payload)
+        cells = zlib.decompress(payload[KEYFRAME_HEADER.size:])
+        return generation, np.frombuffer(cells, dtype=np.uint8).reshape(height, width).copy()
+    if kind == DIFF:
+        generation, count = DIFF_HEADER.unpack_from(payload)
+        return (generation,) + _cells(payload, DIFF_HEADER.size, count)
+    if kind == EDITS:
+        count, = EDITS_HEADER.unpack_from(payload)
+        return _cells(payload, EDITS_HEADER.size, count)
+    raise ValueError(f"unknown message kind {kind!r}")
+
+
+async def read_message(reader):
+    """The next ``(kind, payload)``; raises IncompleteReadError at the end."""
+    kind, length = HEADER.unpack(await reader.readexactly(HEADER.size))
+    return kind, await reader.readexactly(length)
+
+
+class _Client:
+    """A viewer's outgoing queue; None in it means "send a keyframe"."""
+
+    def __init__(self, queue_size):
+        self.queue = asyncio.Queue(queue_size)
+        self.queue.put_nowait(None)
+        self.resync = True
+        self.generation = -1  # last generation sent
+
+    def offer(self, generation, data):
+        if self.resync:
+            return
+        try:
+            self.queue.put_nowait((generation, data))
+        except asyncio.QueueFull:
+            # too slow for diffs: drop them and catch up with a keyframe
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            self.resync = True
+
+
+class LifeServer:
+    """Steps an ``Engine`` (life.headless) ``fps`` times a second for TCP clients."""
+
+    def __init__(self, engine, fps=10, queue_size=64):
+        self.engine = engine
+        self.fps = fps
+        self.queue_size = queue_size
+        self.generation = 0
+        self.board = np.array(engine.visible(), dtype=np.uint8)
+        self.clients = set()
+        self._edits = []
+        self._keyframe = None  # (generation, encoded), shared by clients resyncing together
+
+    def keyframe(self):
+        if self._keyframe is None or self._keyframe[0] != self.generation:
+            self._keyframe = (self.generation, encode_keyframe(self.generation, self.board))
+        return self._keyframe[1]
+
+    def _apply_edits(self):
+        if not self._edits:
+            return
+        board = self.engine.board
+        height, width = self.board.shape
+        # a typed state: toggle the type, and the cell starts again at age 0
+        types, ages = (board[0], board[1]) if np.ndim(board) == 3 else (board, None)
+        for indices, cells in self._edits:
+            for index, cell in zip(indices.tolist(), cells.tolist()):
+                if index >= width * height:
+                    continue
+                y, x = divmod(index, width)
+                types[y][x] = CELL_EMPTY if types[y][x] == cell else cell
+                if ages is not None:
+                    ages[y][x] = 0
+        self._edits.clear()
+
+    async def run_clock(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            self._apply_edits()
+            # off the event loop, so clients are served while big boards step
+            await loop.run_in_executor(None, self.engine.step)
+            board = np.array(self.engine.visible(), dtype=np.uint8)
+            changed = np.flatnonzero(board != self.board)
+            self.board = board
+            self.generation += 1
+            data = encode_diff(self.generation, changed, board.ravel()[changed])
+            for client in self.clients:
+                client.offer(self.generation, data)
+            await asyncio.sleep(max(1 / self.fps - (loop.time() - start), 0))
+
+    async def serve_client(self, reader, writer):
+        client = _Client(self.queue_size)
+        self.clients.add(client)
+        sending = asyncio.ensure_future(self._send(client, writer))
+        try:
+            while True:
+                kind, payload = await read_message(reader)
+                if kind != EDITS:
+                    break
+                self._edits.append(decode(kind, payload))
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self.clients.discard(client)
+            sending.cancel()
+            writer.close()
+
+    async def _send(self, client, writer):
+        try:
+            while True:
+                item = await client.queue.get()
+                if item is None:
+                    client.resync = False
+                    client.generation = self.generation
+                    writer.write(self.keyframe())
+                else:
+                    generation, data = item
+                    if generation <= client.generation:
+                        continue  # already in the keyframe
+                    client.generation = generation
+                    writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+
+
+async def serve(server, host="127.0.0.1", port=DEFAULT_PORT):
+    listener = await asyncio.start_server(server.serve_client, host, port)
+    async with listener:
+        await server.run_clock()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--release", choices=RELEASES, default="4")
+    parser.add_argument("--width", type=int, default=80)
+    parser.add_argument("--height", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--density", type=float, default=0.5,
+                        help="fraction of cells alive at the start")
+    parser.add_argument("--engine", default="auto", choices=("auto", "numpy", "python"))
+    parser.add_argument("--fps", type=float, default=10, help="generations per second")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--queue", type=int, default=64,
+                        help="diffs queued per client before it gets a keyframe instead")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    engine = make_engine(args.release, args.engine, args.width, args.height,
+                         args.density, args.seed)
+    server = LifeServer(engine, args.fps, args.queue)
+    print(f"serving release {args.release} {args.width}x{args.height} "
+          f"on {args.host}:{args.port}", file=sys.stderr)
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
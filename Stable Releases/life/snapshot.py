@@ -0,0 +1,107 @@
+"""Binary board snapshots that can be memory-mapped.
+
+A snapshot is a 64-byte header followed by the cells, row by row: one byte
+per cell, or for two-state boards 64 cells per little-endian uint64 word as
+in life.bitpack.  Opening one maps the cell data with ``numpy.memmap``, so
+only the rows that are actually read are loaded from disk.
+
+Header (little endian): magic ``b"LIFESNAP"``, format version (u16), bits
+per cell (u16, 1 or 8), width and height (u32), generation (u64), then
+zero padding up to ``DATA_OFFSET``.
+"""
+import struct
+
+import numpy as np
+
+from life import bitpack
+
+MAGIC = b"LIFESNAP"
+VERSION = 1
+DATA_OFFSET = 64
+_HEADER = struct.Struct("<8sHHIIQ")
+
+
+class Snapshot:
+    """An opened snapshot; ``data`` is the memory-mapped cell array."""
+
+    def __init__(self, path, width, height, bits, generation, data):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.bits = bits
+        self.generation = generation
+        self.data = data
+
+    def rows(self, top, bottom):
+        """Rows [top, bottom) as a uint8 board, reading only those rows."""
+        if self.bits == 1:
+            return bitpack.unpack(np.asarray(self.data[top:bottom]), self.width)
+        return np.array(self.data[top:bottom])
+
+    def to_array(self):
+        """The whole board as a uint8 array in memory."""
+        return self.rows(0, self.height)
+
+
+def save(path, board, generation=0, bits=None):
+    """Write a board; ``bits`` defaults to 1 if it only holds 0 and 1, else 8."""
+    board = np.asarray(board, dtype=np.uint8)
+    height, width = board.shape
+    if bits is None:
+        bits = 1 if board.max(initial=0) <= 1 else 8
+    if bits == 1:
+        data = bitpack.pack(board)
+    elif bits == 8:
+        data = board
+    else:
+        raise ValueError("bits must be 1 or 8")
+    header = _HEADER.pack(MAGIC, VERSION, bits, width, height, generation)
+    with open(path, "wb") as f:
+        f.write(header.ljust(DATA_OFFSET, b"\0"))
+        np.ascontiguousarray(data, dtype=data.dtype.newbyteorder("<")).tofile(f)
+
+
+def open_snapshot(path, mode="r"):
+    """Map a snapshot written by save(); ``mode="r+"`` allows writing cells back."""
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise ValueError(f"{path}: too short for a snapshot")
+    magic, version, bits, width, height, generation = _HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a snapshot")
+    if version != VERSION:
+        raise ValueError(f"{path}: unsupported snapshot version {version}")
+    if bits == 1:
+        dtype, shape = np.dtype("<u8"), (height, bitpack.words_for(width))
+    elif bits == 8:
+        dtype, shape = np.dtype(np.uint8), (height, width)
+    else:
+        raise ValueError(f"{path}: bad bits per cell {bits}")
+    data = np.memmap(path, dtype=dtype, mode=mode, offset=DATA_OFFSET, shape=shape)
+    return Snapshot(path, width, height, bits, generation, data)
+
+
+def load(path):
+    """Read a whole snapshot; returns ``(board, generation)``."""
+    snapshot = open_snapshot(path)
+    return snapshot.to_array(), snapshot.generation
+
+
+def load_centered(path, width, height):
+    """A snapshot centered on an empty width x height board, wrapping if it is
+    too big; returns ``(board, generation)``.
+
+    A snapshot that fits is read from the map straight into the board.
+    """
+    snapshot = open_snapshot(path)
+    board = np.zeros((height, width), dtype=np.uint8)
+    top, left = (height - snapshot.height) // 2, (width - snapshot.width) // 2
+    if top >= 0 and left >= 0:
+        board[top:top + snapshot.height, left:left + snapshot.width] = \
+            snapshot.rows(0, snapshot.height)
+    else:
+        cells = snapshot.to_array()
+        ys, xs = np.nonzero(cells)
+        board[(top + ys) % height, (left + xs) % width] = cells[ys, xs]
+    return board, snapshot.generation
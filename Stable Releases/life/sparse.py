@@ -0,0 +1,162 @@
+"""Unbounded board made of fixed-size chunks.
+
+Instead of a ``GRID_WIDTH`` x ``GRID_HEIGHT`` torus, cells live on an
+infinite plane split into ``CHUNK`` x ``CHUNK`` blocks.  Only blocks with
+live cells are stored; a block is created when something is born in it and
+dropped as soon as it is empty, so memory follows the live regions, not the
+extent of the pattern.
+
+Each generation only chunks that have live cells, or that border live
+cells close enough to their edge, are stepped.  Each is padded with the
+facing edges of its 8 neighbors and stepped on its own.  With the typed
+rules a chunk is a typed state (cell types and ages, see
+vectorized.typed_state()), so blinkers blink; the cell accessors deal in
+cell types.
+"""
+import numpy as np
+
+from life import vectorized
+
+CHUNK = 64
+_HALO = {"classic": 1, "typed": 2}
+# VIRAL ids on the plane: y and x each taken modulo 2**32.
+_PLANE_WIDTH = 2 ** 32
+
+# (dy, dx) of the 8 neighbors, with the matching source and destination
+# slices of the padded block, filled in by _layout().
+_LAYOUTS = {}
+
+
+def _layout(halo):
+    if halo not in _LAYOUTS:
+        size = CHUNK
+        source = {-1: slice(size - halo, size), 0: slice(0, size), 1: slice(0, halo)}
+        dest = {-1: slice(0, halo), 0: slice(halo, halo + size),
+                1: slice(halo + size, size + 2 * halo)}
+        _LAYOUTS[halo] = [((dy, dx), (source[dy], source[dx]), (dest[dy], dest[dx]))
+                          for dy in (-1, 0, 1) for dx in (-1, 0, 1)]
+    return _LAYOUTS[halo]
+
+
+class SparseUniverse:
+    """An infinite board stepped with the "classic" or "typed" rules."""
+
+    def __init__(self, rules="classic", rng=None):
+        if rules not in _HALO:
+            raise ValueError(f"unknown rules {rules!r}")
+        if rules == "typed" and rng is None:
+            raise ValueError("the typed rules need an rng")
+        self.rules = rules
+        self.rng = rng
+        self.halo = _HALO[rules]
+        self.generation = 0
+        self.chunks = {}
+        planes = (2,) if rules == "typed" else ()
+        self._shape = planes + (CHUNK, CHUNK)
+
+    # -- cells -------------------------------------------------------------
+
+    def get(self, x, y):
+        chunk = self.chunks.get((x // CHUNK, y // CHUNK))
+        return 0 if chunk is None else int(_types(chunk)[y % CHUNK, x % CHUNK])
+
+    def set(self, x, y, value, age=0):
+        key = (x // CHUNK, y // CHUNK)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            if not value:
+                return
+            chunk = self.chunks[key] = np.zeros(self._shape, dtype=np.uint8)
+        _types(chunk)[y % CHUNK, x % CHUNK] = value
+        if chunk.ndim == 3:
+            chunk[1, y % CHUNK, x % CHUNK] = age if value else 0
+        if not value and not chunk.any():
+            del self.chunks[key]
+
+    def from_grid(self, grid, x=0, y=0):
+        """Paste a list-of-lists grid, board or typed state with its top-left cell at (x, y)."""
+        board = vectorized.to_array(grid)
+        ages = board[1] if board.ndim == 3 else np.zeros_like(board)
+        board = _types(board)
+        for gy, gx in zip(*np.nonzero(board)):
+            self.set(x + int(gx), y + int(gy), int(board[gy, gx]), int(ages[gy, gx]))
+
+    def to_grid(self, width, height, x=0, y=0):
+        """Cut the cell types of the width x height window at (x, y) out as a board."""
+        board = np.zeros((height, width), dtype=np.uint8)
+        for (cx, cy), chunk in self.chunks.items():
+            left, top = cx * CHUNK - x, cy * CHUNK - y
+            x0, y0 = max(left, 0), max(top, 0)
+            x1, y1 = min(left + CHUNK, width), min(top + CHUNK, height)
+            if x0 < x1 and y0 < y1:
+                board[y0:y1, x0:x1] = _types(chunk)[y0 - top:y1 - top, x0 - left:x1 - left]
+        return board
+
+    def cells(self):
+        """Yield (x, y, value) for every live cell."""
+        for (cx, cy), chunk in self.chunks.items():
+            types = _types(chunk)
+            for cy_, cx_ in zip(*np.nonzero(types)):
+                yield cx * CHUNK + int(cx_), cy * CHUNK + int(cy_), int(types[cy_, cx_])
+
+    @property
+    def population(self):
+        return sum(int(np.count_nonzero(_types(chunk))) for chunk in self.chunks.values())
+
+    @property
+    def nbytes(self):
+        """Bytes held by cell storage."""
+        return len(self.chunks) * int(np.prod(self._shape))
+
+    # -- stepping ----------------------------------------------------------
+
+    def step(self):
+        """Advance one generation."""
+        key = vectorized.generation_key(self.rng) if self.rules == "typed" else None
+        chunks = {}
+        for cx, cy in self._candidates():
+            chunk = self._step_chunk(cx, cy, key)
+            if chunk.any():
+                chunks[(cx, cy)] = chunk
+        self.chunks = chunks
+        self.generation += 1
+
+    def _candidates(self):
+        """Live chunks, plus neighbors their edge cells can reach."""
+        halo = self.halo
+        candidates = set()
+        for (cx, cy), chunk in self.chunks.items():
+            chunk = _types(chunk)
+            top, bottom = chunk[:halo].any(axis=0), chunk[-halo:].any(axis=0)
+            left, right = chunk[:, :halo].any(axis=1), chunk[:, -halo:].any(axis=1)
+            reach = {
+                (0, 0): True,
+                (-1, 0): top.any(), (1, 0): bottom.any(),
+                (0, -1): left.any(), (0, 1): right.any(),
+                (-1, -1): top[:halo].any(), (-1, 1): top[-halo:].any(),
+                (1, -1): bottom[:halo].any(), (1, 1): bottom[-halo:].any(),
+            }
+            candidates.update((cx + dx, cy + dy) for (dy, dx), hit in reach.items() if hit)
+        return candidates
+
+    def _step_chunk(self, cx, cy, key):
+        halo = self.halo
+        padded = np.zeros(self._shape[:-2] + (CHUNK + 2 * halo, CHUNK + 2 * halo),
+                          dtype=np.uint8)
+        for (dy, dx), source, dest in _layout(halo):
+            neighbor = self.chunks.get((cx + dx, cy + dy))
+            if neighbor is not None:
+                padded[(Ellipsis,) + dest] = neighbor[(Ellipsis,) + source]
+        if self.rules == "classic":
+            result = vectorized.step_classic(padded)
+        else:
+            rows = np.arange(cy * CHUNK - halo, (cy + 1) * CHUNK + halo) % _PLANE_WIDTH
+            cols = np.arange(cx * CHUNK - halo, (cx + 1) * CHUNK + halo) % _PLANE_WIDTH
+            ids = vectorized.cell_ids(rows, cols, _PLANE_WIDTH)
+            result = vectorized.step_typed_state_region(padded, key, ids)
+        return result[..., halo:-halo, halo:-halo].copy()
+
+
+def _types(chunk):
+    """The cell types of a chunk (or board), without the ages of a typed state."""
+    return chunk[0] if chunk.ndim == 3 else chunk
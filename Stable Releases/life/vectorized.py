@@ -0,0 +1,232 @@
+"""Whole-board NumPy step functions.
+
+Boards are ``uint8`` arrays indexed ``[y, x]`` like the list-of-lists
+``grid`` of the releases, and the edges wrap around (torus) exactly like
+``get_neighbors()``.  All functions work on the last two axes, so a stack of
+boards can be stepped at once.
+"""
+import numpy as np
+
+
+def to_array(grid):
+    """Convert a list-of-lists grid (or an existing board) to a uint8 board."""
+    return np.asarray(grid, dtype=np.uint8)
+
+
+def to_grid(board):
+    """Convert a board back to the list-of-lists layout."""
+    return np.asarray(board).tolist()
+
+
+def neighbor_count(alive):
+    """Count the 8 wrapped neighbors of every cell of a 0/1 board."""
+    alive = np.asarray(alive, dtype=np.uint8)
+    # Sum each 3-row column first, then add the columns on either side.
+    rows = alive + np.roll(alive, 1, axis=-2) + np.roll(alive, -1, axis=-2)
+    total = rows + np.roll(rows, 1, axis=-1) + np.roll(rows, -1, axis=-1)
+    return total - alive
+
+
+def step_classic(board, out=None):
+    """Compute the next generation with the 1.py rules (B3/S23).
+
+    With ``out`` (a uint8 array of the board's shape, not the board itself)
+    the generation is written into it and returned.
+    """
+    alive = to_array(board) == 1
+    neighbors = neighbor_count(alive)
+    born = neighbors == 3
+    survives = alive & (neighbors == 2)
+    if out is None:
+        return (born | survives).astype(np.uint8)
+    return np.bitwise_or(born, survives, out=out)
+
+
+# Cell types of the multi-type releases (4.py numbering).
+EMPTY, NORMAL, IMMORTAL, EPHEMERAL, VIRAL, SHRINKER, SPREADER, BLINKER = range(8)
+
+# Generations a cell's age counts before wrapping back to 0, by type.  A
+# BLINKER is lit at age 0 and dark at age 1; every other type stays at 0, so
+# still lifes and oscillators still repeat exactly.
+AGE_PERIODS = np.ones(256, dtype=np.uint8)
+AGE_PERIODS[BLINKER] = 2
+
+# Neighbor offsets (dy, dx) in the order the releases' update() visits them.
+OFFSETS = [(dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dy or dx]
+
+
+def make_rng(seed=None):
+    """Return the random generator step_typed() expects."""
+    return np.random.default_rng(seed)
+
+
+def random_board(width, height, density, types=(NORMAL,), seed=None):
+    """Seeded board whose live cells are drawn evenly from ``types``.
+
+    ``seed`` may also be a generator from make_rng(), which is drawn from.
+    """
+    rng = make_rng(seed)
+    alive = rng.random((height, width)) < density
+    cells = rng.choice(np.asarray(types, dtype=np.uint8), size=(height, width))
+    return np.where(alive, cells, 0).astype(np.uint8)
+
+
+def generation_key(rng):
+    """Draw the per-generation key that picks VIRAL targets."""
+    return np.uint64(rng.integers(2 ** 63))
+
+
+def cell_ids(rows, cols, width):
+    """Global cell ids (y * width + x) for the given row and column indices."""
+    rows = np.asarray(rows, dtype=np.uint64)[:, None]
+    cols = np.asarray(cols, dtype=np.uint64)[None, :]
+    return rows * np.uint64(width) + cols
+
+
+def shift(board, dy, dx):
+    """Return, for every cell, the wrapped value at (y + dy, x + dx)."""
+    return np.roll(board, (-dy, -dx), axis=(-2, -1))
+
+
+def step_typed(board, rng):
+    """Compute the next generation with the 4.py rules.
+
+    The old per-cell loop let whichever cell was visited last win when
+    several rules wrote the same cell.  Here every rule is evaluated against
+    the previous board and the results are applied in a fixed priority order,
+    lowest first:
+
+    1. the cell's own rule (IMMORTAL and VIRAL stay, NORMAL survives on 2 or
+       3 live neighbors, EMPTY is born on 3 NORMAL/IMMORTAL neighbors,
+       everything else dies);
+    2. VIRAL infection of one random EMPTY neighbor;
+    3. SPREADER infection of every EMPTY neighbor;
+    4. SHRINKER clearing all of its neighbors;
+    5. BLINKER cells staying in place (the loop's final restore pass).
+
+    This is the result the loop gave whenever the acting cell came after
+    its target in scan order.  ``rng`` (see make_rng()) is drawn from once per
+    generation, so a seeded run is reproducible.  A board has no ages, so its
+    blinkers stay lit; step a typed state (step_typed_state()) to make them
+    blink.
+    """
+    board = to_array(board)
+    height, width = board.shape[-2:]
+    ids = cell_ids(np.arange(height), np.arange(width), width)
+    return step_typed_region(board, generation_key(rng), ids)
+
+
+def step_typed_region(board, key, ids, ages=None):
+    """step_typed() with the generation key and global cell ids given.
+
+    Use this to step part of a board: pad the part with two cells of
+    wrapped context on each side, pass the global ids of the padded cells,
+    and keep the inner result.  With ``ages``, dark blinkers don't count as
+    live neighbors.
+    """
+    empty = board == EMPTY
+    lit = ~empty
+    if ages is not None:
+        lit &= ~((board == BLINKER) & (ages != 0))
+    alive = neighbor_count(lit)
+    normals = neighbor_count((board == NORMAL) | (board == IMMORTAL))
+
+    new = np.zeros_like(board)
+    new[board == IMMORTAL] = IMMORTAL
+    new[board == VIRAL] = VIRAL
+    new[(board == NORMAL) & ((alive == 2) | (alive == 3))] = NORMAL
+    new[empty & (normals == 3)] = NORMAL
+
+    viral = board == VIRAL
+    if viral.any():
+        new[_viral_targets(empty, viral, key, ids)] = VIRAL
+    spreaders = board == SPREADER
+    if spreaders.any():
+        new[empty & (neighbor_count(spreaders) > 0)] = SPREADER
+    shrinkers = board == SHRINKER
+    if shrinkers.any():
+        new[neighbor_count(shrinkers) > 0] = EMPTY
+    new[board == BLINKER] = BLINKER
+    return new
+
+
+def typed_state(board, ages=None):
+    """Stack a board's types and ages (zero by default) into a typed state.
+
+    A typed state is a uint8 array ``(..., 2, height, width)``: the cell
+    types, then each cell's age in generations (see AGE_PERIODS), two bytes
+    per cell.
+    """
+    board = to_array(board)
+    if ages is None:
+        ages = np.zeros_like(board)
+    return np.stack([board, to_array(ages)], axis=-3)
+
+
+def visible(state):
+    """The board a typed state shows: its types, with dark blinkers empty."""
+    types, ages = state[..., 0, :, :], state[..., 1, :, :]
+    return np.where((types == BLINKER) & (ages != 0), np.uint8(EMPTY), types)
+
+
+def changed_cells(old, new):
+    """Flat indices of the cells that differ between two boards (or typed
+    states: cells whose type or age differs)."""
+    changed = old != new
+    if changed.ndim == 3:
+        changed = changed.any(axis=0)
+    return np.flatnonzero(changed)
+
+
+def step_typed_state(state, rng, out=None):
+    """step_typed() for a typed state; ages count up and blinkers blink.
+
+    With ``out`` the new state is written into it, as in step_classic().
+    """
+    state = to_array(state)
+    height, width = state.shape[-2:]
+    ids = cell_ids(np.arange(height), np.arange(width), width)
+    return step_typed_state_region(state, generation_key(rng), ids, out)
+
+
+def step_typed_state_region(state, key, ids, out=None):
+    """step_typed_region() for a typed state.
+
+    A cell that keeps its type grows a generation older, wrapping at its
+    type's AGE_PERIODS; a cell that changes type starts again at age 0.
+    """
+    types, ages = state[..., 0, :, :], state[..., 1, :, :]
+    new = step_typed_region(types, key, ids, ages)
+    new_ages = np.where(new == types, (ages + 1) % AGE_PERIODS[new], 0).astype(np.uint8)
+    if out is None:
+        return np.stack([new, new_ages], axis=-3)
+    out[..., 0, :, :] = new
+    out[..., 1, :, :] = new_ages
+    return out
+
+
+def _viral_targets(empty, viral, key, ids):
+    """Mask of the EMPTY cells infected by a VIRAL neighbor."""
+    open_dirs = [shift(empty, dy, dx) for dy, dx in OFFSETS]
+    counts = np.sum(open_dirs, axis=0, dtype=np.uint8)
+    infecting = viral & (counts > 0)
+    keys = np.broadcast_to(key, viral.shape)[infecting]
+    ids = np.broadcast_to(ids, viral.shape)[infecting]
+    # Index of the chosen one among the cell's empty neighbors.
+    pick = np.full(viral.shape, len(OFFSETS), dtype=np.uint8)
+    pick[infecting] = mix(keys, ids) % counts[infecting]
+
+    targets = np.zeros_like(viral)
+    seen = np.zeros(viral.shape, dtype=np.uint8)
+    for (dy, dx), open_dir in zip(OFFSETS, open_dirs):
+        targets |= shift(open_dir & (seen == pick), -dy, -dx)
+        seen += open_dir
+    return targets
+
+
+def mix(keys, ids):
+    """Hash (key, cell id) pairs to uniform uint64s (splitmix64)."""
+    z = ids * np.uint64(0x9E3779B97F4A7C15) + keys
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
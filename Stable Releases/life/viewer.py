@@ -0,0 +1,151 @@
+"""Watch and edit a board served by life.server.
+
+Run from the ``Stable Releases`` directory, with a server running::
+
+    python -m life.viewer --release 4 --host 127.0.0.1
+
+The board is drawn with the release's draw_grid().  Click to toggle a
+cell, 1-7 pick the cell type placed; on the 4.py release the mouse wheel
+zooms, right-drag pans and H resets the view.  Clicks are sent to the
+server once per frame and show up on its next generation.
+"""
+import argparse
+import asyncio
+import inspect
+import sys
+
+import numpy as np
+
+from life.camera import Camera
+from life.headless import RELEASES, load_release
+from life.server import DEFAULT_PORT, DIFF, KEYFRAME, decode, encode_edits, read_message
+
+
+class RemoteBoard:
+    """The latest board and generation received from a server."""
+
+    def __init__(self):
+        self.generation = None
+        self.board = None
+        self.keyframes = 0
+        self.ready = asyncio.Event()
+        self._changed = None  # diff indices since take_changes(); None after a keyframe
+
+    def apply(self, kind, payload):
+        if kind == KEYFRAME:
+            self.generation, self.board = decode(kind, payload)
+            self.keyframes += 1
+            self._changed = None
+            self.ready.set()
+        elif kind == DIFF and self.board is not None:
+            generation, indices, cells = decode(kind, payload)
+            if generation == self.generation + 1:
+                self.board.ravel()[indices] = cells
+                self.generation = generation
+                if self._changed is not None:
+                    self._changed.append(indices)
+
+    def take_changes(self):
+        """Flat indices of the cells changed since the last call, or None if unknown."""
+        changed, self._changed = self._changed, []
+        if changed is None or not changed:
+            return changed
+        return np.concatenate(changed)
+
+
+async def receive(reader, remote):
+    while True:
+        remote.apply(*await read_message(reader))
+
+
+async def view(host, port, release, fps=60):
+    import pygame
+    reader, writer = await asyncio.open_connection(host, port)
+    remote = RemoteBoard()
+    receiving = asyncio.ensure_future(receive(reader, remote))
+    ready = asyncio.ensure_future(remote.ready.wait())
+    await asyncio.wait([receiving, ready], return_when=asyncio.FIRST_COMPLETED)
+    if not remote.ready.is_set():
+        receiving.result()  # raises why the connection ended
+
+    height, width = remote.board.shape
+    module = load_release(release, width, height)
+    cell_size = module.CELL_SIZE
+    window = getattr(module, "WINDOW_SIZE", (width * cell_size, height * cell_size))
+    window = (min(width * cell_size, window[0]), min(height * cell_size, window[1]))
+    camera = None
+    parameters = inspect.signature(module.draw_grid).parameters
+    if "camera" in parameters:
+        camera = Camera(window, (width, height), cell_size)
+    pygame.init()
+    screen = pygame.display.set_mode(window)
+    pygame.display.set_caption(f"Game of Life - {host}:{port}")
+    font = pygame.font.SysFont(None, 24)
+    placement_type = 1
+    types = sorted(getattr(module, "TYPE_COLORS", {1: None}))
+
+    try:
+        while not receiving.done():
+            indices, cells = [], []
+            for ev in pygame.event.get():
+                if ev.type == pygame.QUIT:
+                    return
+                elif ev.type == pygame.KEYDOWN:
+                    if ev.unicode.isdigit() and int(ev.unicode) in types:
+                        placement_type = int(ev.unicode)
+                    elif ev.key == pygame.K_h and camera is not None:
+                        camera.home()
+                elif ev.type == pygame.MOUSEBUTTONDOWN and ev.button == 1:
+                    if camera is not None:
+                        gx, gy = camera.to_cell(ev.pos)
+                    else:
+                        gx, gy = ev.pos[0] // cell_size, ev.pos[1] // cell_size
+                    indices.append(gy % height * width + gx % width)
+                    cells.append(placement_type)
+                elif ev.type == pygame.MOUSEWHEEL and camera is not None:
+                    camera.zoom_at(pygame.mouse.get_pos(), ev.y)
+                elif (ev.type == pygame.MOUSEMOTION and camera is not None
+                      and (ev.buttons[1] or ev.buttons[2])):
+                    camera.pan(*ev.rel)
+            if indices:
+                writer.write(encode_edits(indices, cells))
+
+            if "changed" in parameters:
+                module.draw_grid(screen, remote.board, camera, remote.take_changes())
+            elif camera is not None:
+                module.draw_grid(screen, remote.board, camera)
+            else:
+                module.draw_grid(screen, remote.board)
+            label = f"Type {placement_type} | Gen {remote.generation} | Keyframes {remote.keyframes}"
+            screen.blit(font.render(label, True, module.COLOR_TEXT), (10, 10))
+            pygame.display.flip()
+            await asyncio.sleep(1 / fps)
+        receiving.result()
+    finally:
+        receiving.cancel()
+        writer.close()
+        pygame.quit()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--release", choices=RELEASES, default="4",
+                        help="whose draw_grid() and colors to use")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--fps", type=float, default=60, help="frames drawn per second")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        asyncio.run(view(args.host, args.port, args.release, args.fps))
+    except (ConnectionError, asyncio.IncompleteReadError) as error:
+        print(f"{args.host}:{args.port}: {error or 'connection closed'}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
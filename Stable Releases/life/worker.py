@@ -0,0 +1,314 @@
+"""Background simulation thread for the release main loops.
+
+The worker steps the board on its own thread and publishes every finished
+generation by swapping a reference.  It never modifies a board the UI may
+still hold; edits are applied to a fresh copy.  So the UI can keep drawing
+the board it holds while the next one is computed, without copies per
+frame.  NumPy boards can be stepped into three recycled buffers (triple
+buffering): the newest published board, the one the UI took last and the
+one being written, so no board is allocated per generation.
+
+With a life.cycles.CycleDetector the worker also notices when the board
+starts repeating.  From then on it plays the cycle back instead of stepping,
+and turbo jumps ahead by whole periods.  With a life.history.History it
+records every generation and can go back to any retained one.
+"""
+import queue
+import threading
+import time
+from collections import deque
+
+
+def copy_board(board):
+    """Copy a NumPy board or a list-of-lists grid (or a list of grids)."""
+    if hasattr(board, "copy") and not isinstance(board, list):
+        return board.copy()
+    return [copy_board(row) if row and isinstance(row[0], list) else row[:] for row in board]
+
+
+def toggle(board, x, y, cell_type):
+    """Set (x, y) to cell_type, or clear it if it already is."""
+    board[y][x] = 0 if board[y][x] == cell_type else cell_type
+
+
+class SimulationWorker:
+    """Steps ``step(board) -> board`` in a daemon thread.
+
+    ``fps`` caps the simulation rate unless ``turbo`` is set, in which case
+    it runs as fast as it can.  Edits queued from the UI thread (toggle(),
+    replace()) are applied between generations, also while paused.
+
+    If ``detector`` is given, ``cycle`` is ``(onset, period)`` once the
+    board repeats, else None.  Cycles up to ``max_period`` generations
+    long are played back from memory without calling ``step``; in turbo
+    each tick then skips ``fast_forward`` generations, rounded up to
+    whole periods.
+
+    If ``history`` is given, seek() goes back (or forward) to a retained
+    generation and pauses.  Running on from there replays the recorded
+    generations, VIRAL choices included, until it reaches the newest one;
+    an edit drops the generations after it.
+
+    ``edit(board, x, y, cell_type)`` applies a toggle() to a copy of the
+    board, for boards that are more than a grid of cell types.
+
+    With ``reuse``, ``step(board, out)`` writes the next generation into
+    ``out``: one of three buffers the worker recycles, or None while the
+    board isn't a NumPy array.  A board returned by latest() then stays
+    unchanged only until the next call to latest().
+
+    With ``changes(old, new)``, which returns the flat indices (``y * width
+    + x``) of the cells that differ between two boards of the same shape,
+    every published board is compared with the one before it on the
+    worker thread, and latest_changes() reports the cells changed since
+    the UI last asked.
+    """
+
+    def __init__(self, board, step, fps=10, detector=None, max_period=64,
+                 fast_forward=1000, history=None, edit=toggle, reuse=False, changes=None):
+        self.step = step
+        self.edit = edit
+        self.reuse = reuse
+        self.changes = changes
+        self.fps = fps
+        self.detector = detector
+        self.history = history
+        self.fast_forward = fast_forward
+        self.cycle = None
+        self._recent = deque(maxlen=max_period + 1)
+        self._cycle_boards = None
+        self._latest = (0, board)
+        self._buffers = []
+        self._taken = None  # the board the UI last got from latest()
+        self._changed = None  # index arrays since latest_changes(); None if unknown
+        self._changed_count = 0
+        self._lock = threading.Lock()
+        self._paused = False
+        self._turbo = False
+        self._step_once = False
+        self._edits = queue.SimpleQueue()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="simulation", daemon=True)
+
+    # -- UI thread ---------------------------------------------------------
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+
+    def latest(self):
+        """Return ``(generation, board)`` of the newest published generation."""
+        with self._lock:
+            latest = self._latest
+            self._taken = latest[1]
+        return latest
+
+    def latest_changes(self):
+        """latest(), plus the cells changed since the last latest_changes().
+
+        Returns ``(generation, board, changed)``: ``changed`` is a list of
+        arrays of flat cell indices (possibly repeated), or None if they
+        are not known (no ``changes`` function, a new board shape, or more
+        changes than the board has cells).
+        """
+        with self._lock:
+            generation, board = self._latest
+            self._taken = board
+            changed, self._changed = self._changed, []
+            self._changed_count = 0
+        return generation, board, changed
+
+    @property
+    def paused(self):
+        return self._paused
+
+    @paused.setter
+    def paused(self, value):
+        self._paused = value
+        self._wake.set()
+
+    @property
+    def turbo(self):
+        return self._turbo
+
+    @turbo.setter
+    def turbo(self, value):
+        self._turbo = value
+        self._wake.set()
+
+    def toggle(self, x, y, cell_type):
+        """Queue a click: set (x, y) to cell_type, or clear it if it already is."""
+        self._edits.put(("toggle", x, y, cell_type))
+        self._wake.set()
+
+    def replace(self, board):
+        """Queue replacing the whole board (the R and C keys)."""
+        self._edits.put(("replace", board))
+        self._wake.set()
+
+    def seek(self, generation):
+        """Queue jumping to a retained generation (clamped to the history) and pause."""
+        self._paused = True
+        self._edits.put(("seek", generation))
+        self._wake.set()
+
+    def step_forward(self):
+        """Queue advancing a single generation while paused."""
+        self._edits.put(("forward",))
+        self._wake.set()
+
+    # -- worker thread -----------------------------------------------------
+
+    def _apply_edits(self, generation, board):
+        """Apply queued edits; return the new (generation, board), or None if none.
+
+        Cells are edited on a copy of the board.
+        """
+        result = None
+        changed = False
+        while True:
+            try:
+                edit = self._edits.get_nowait()
+            except queue.Empty:
+                break
+            if edit[0] == "forward":
+                self._step_once = True
+                continue
+            if edit[0] == "seek":
+                if self.history is None or not len(self.history):
+                    continue
+                generation = min(max(edit[1], self.history.first), self.history.last)
+                board = self.history.get(generation)
+                result, changed = (generation, board), False
+                continue
+            if edit[0] == "replace":
+                board = edit[1]
+            else:
+                _, x, y, cell_type = edit
+                if not changed:
+                    board = copy_board(board)
+                self.edit(board, x, y, cell_type)
+            result, changed = (generation, board), True
+        if changed and self.history is not None:
+            self.history.record(generation, board)
+        return result
+
+    def _run(self):
+        next_tick = time.perf_counter()
+        if self.history is not None and not len(self.history):
+            self.history.record(*self._latest)
+        while not self._stop.is_set():
+            # Clear before looking at the queue so no wake-up is lost.
+            self._wake.clear()
+            edited = self._apply_edits(*self._latest)
+            if edited is not None:
+                self._publish(edited)
+                self._forget_cycle()
+            generation, board = self._latest
+
+            now = time.perf_counter()
+            if self._paused:
+                if self._step_once:
+                    self._step_once = False
+                    self._publish(self._advance(generation, board))
+                    continue
+                self._wake.wait()
+                continue
+            # Playing back a cycle costs nothing, so it stays at fps
+            throttled = not self._turbo or self._cycle_boards is not None
+            if throttled and now < next_tick:
+                self._wake.wait(next_tick - now)
+                continue
+
+            self._publish(self._advance(generation, board))
+            if throttled:
+                next_tick = max(next_tick, now) + 1 / self.fps
+            else:
+                next_tick = now
+
+    def _publish(self, latest):
+        """Make ``(generation, board)`` the newest generation, noting its changes."""
+        changed = None
+        old, new = self._latest[1], latest[1]
+        if (self.changes is not None and not isinstance(new, list)
+                and getattr(old, "shape", None) == new.shape):
+            changed = self.changes(old, new)
+        with self._lock:
+            self._latest = latest
+            if changed is None or self._changed_count + len(changed) > new.shape[-2] * new.shape[-1]:
+                self._changed = None
+            elif self._changed is not None:
+                self._changed.append(changed)
+                self._changed_count += len(changed)
+
+    def _advance(self, generation, board):
+        """The next (generation, board): replayed, taken from a known cycle, or stepped."""
+        if self.history is not None and generation + 1 in self.history:
+            return generation + 1, self.history.get(generation + 1)
+        generation, board = self._next(generation, board)
+        if self.history is not None:
+            self.history.record(generation, board)
+        return generation, board
+
+    def _next(self, generation, board):
+        if self._cycle_boards is not None:
+            onset, period = self.cycle
+            if self._turbo:
+                generation += period * -(-self.fast_forward // period)
+            else:
+                generation += 1
+            return generation, self._cycle_boards[(generation - onset) % period]
+
+        if self.detector is not None and not self._recent:
+            self.detector.update(board, generation)
+            self._remember(board)
+        board = self.step(board, self._buffer(board)) if self.reuse else self.step(board)
+        generation += 1
+        if self.detector is not None:
+            self._remember(board)
+            period = self.detector.update(board, generation)
+            if period is not None and self.cycle is None:
+                self.cycle = (self.detector.onset, self.detector.period)
+                if period < len(self._recent):
+                    # boards onset .. generation - 1, so index 0 is the onset phase
+                    self._cycle_boards = list(self._recent)[-period - 1:-1]
+        return generation, board
+
+    def _buffer(self, board):
+        """A recycled buffer to step ``board`` into, or None for a list-of-lists grid.
+
+        Of the three, one is ``board`` and one may be held by the UI.
+        """
+        if isinstance(board, list):
+            return None
+        if (not self._buffers or self._buffers[0].shape != board.shape
+                or self._buffers[0].dtype != board.dtype):
+            self._buffers = [board.copy() for _ in range(3)]
+        with self._lock:
+            taken = self._taken
+        return next(buffer for buffer in self._buffers
+                    if buffer is not board and buffer is not taken)
+
+    def _remember(self, board):
+        """Keep ``board`` for playing back a cycle; a copy if its buffer is recycled."""
+        if self.reuse and not isinstance(board, list):
+            if len(self._recent) == self._recent.maxlen:
+                # the oldest board is about to drop out: reuse its array
+                spare = self._recent[0]
+                spare[...] = board
+                board = spare
+            else:
+                board = board.copy()
+        self._recent.append(board)
+
+    def _forget_cycle(self):
+        if self.detector is not None:
+            self.detector.reset()
+        self.cycle = None
+        self._cycle_boards = None
+        self._recent.clear()